@@ -0,0 +1,352 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Reproducible benchmarks for the hot paths of AVLTree, BPlusTree, Graph and ContractionHierarchy. Usage examples:
+#   python benchmarks/benchmark.py --output baseline.json
+#   python benchmarks/benchmark.py --sizes 1000 1000000 --filter avl_tree --baseline baseline.json
+# Inputs are generated from a fixed seed, so that runs on the same machine are comparable.
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Callable, Dict, List, Optional, Union
+
+from prezzemolo.avl_tree import AVLTree
+from prezzemolo.b_plus_tree import BPlusTree
+from prezzemolo.contraction_hierarchy import ContractionHierarchy
+from prezzemolo.graph import Graph
+from prezzemolo.vertex import Vertex
+
+DEFAULT_SIZES: List[int] = [1000, 10000, 100000]
+DEFAULT_REPEAT: int = 5
+DEFAULT_SEED: int = 42
+DEFAULT_TOLERANCE: float = 0.1
+# Number of lookups / searches timed by query benchmarks (capped by the size of the structure)
+QUERY_COUNT: int = 10000
+SEARCH_COUNT: int = 10
+
+# Ordered map engines compared by the tree benchmarks
+_OrderedMap = Union[AVLTree[int, int], BPlusTree[int, int]]
+
+# A benchmark setup function generates the input of the given size (untimed) and returns the function to time
+_SetupFunction = Callable[[int, random.Random], Callable[[], None]]
+
+
+@dataclass(frozen=True)
+class _Benchmark:
+    name: str
+    setup: _SetupFunction
+    # Sizes above max_size are skipped (e.g. dense graphs, whose generation is quadratic)
+    max_size: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class _Result:
+    name: str
+    size: int
+    repeat: int
+    minimum: float
+    median: float
+
+
+# Key generators
+def _sorted_keys(size: int, _randomizer: random.Random) -> List[int]:
+    return list(range(size))
+
+
+def _random_keys(size: int, randomizer: random.Random) -> List[int]:
+    return randomizer.sample(range(size * 10), size)
+
+
+# Keys alternating between the two ends of the range: every insertion lands at the far end of the tree and zig-zag
+# patterns trigger double rotations.
+def _adversarial_keys(size: int, _randomizer: random.Random) -> List[int]:
+    result: List[int] = []
+    low: int = 0
+    high: int = size - 1
+    while low <= high:
+        result.append(low)
+        if low != high:
+            result.append(high)
+        low += 1
+        high -= 1
+    return result
+
+
+_KEY_GENERATORS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "sorted": _sorted_keys,
+    "random": _random_keys,
+    "adversarial": _adversarial_keys,
+}
+
+
+# Graph generators: size is the number of edges
+def _sparse_graph(size: int, randomizer: random.Random) -> Graph[int]:
+    vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(max(size // 4, 2))]
+    for _ in range(size):
+        source: Vertex[int] = vertexes[randomizer.randrange(len(vertexes))]
+        target: Vertex[int] = vertexes[randomizer.randrange(len(vertexes))]
+        if not source.has_neighbor(target):
+            source.add_neighbor(target, randomizer.uniform(1.0, 10.0))
+    return Graph(vertexes)
+
+
+def _dense_graph(size: int, randomizer: random.Random) -> Graph[int]:
+    vertex_count: int = max(int(math.sqrt(size)), 2)
+    vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(vertex_count)]
+    for source in vertexes:
+        for target in vertexes:
+            if source is not target:
+                source.add_neighbor(target, randomizer.uniform(1.0, 10.0))
+    return Graph(vertexes)
+
+
+# Barabási-Albert preferential attachment: each new vertex links to 3 existing vertexes chosen proportionally to their degree
+def _scale_free_graph(size: int, randomizer: random.Random) -> Graph[int]:
+    links_per_vertex: int = 3
+    vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(max(size // (2 * links_per_vertex), links_per_vertex + 1))]
+    # Every vertex appears in endpoints once per incident edge, which makes sampling from it degree-proportional
+    endpoints: List[Vertex[int]] = vertexes[: links_per_vertex + 1]
+    for vertex in vertexes[links_per_vertex + 1 :]:
+        for target in {endpoints[randomizer.randrange(len(endpoints))] for _ in range(links_per_vertex)}:
+            vertex.add_neighbor_bidirectional(target, randomizer.uniform(1.0, 10.0))
+            endpoints.append(target)
+            endpoints.append(vertex)
+    return Graph(vertexes)
+
+
+# Road-network-like graph: square grid with bidirectional edges between adjacent vertexes
+def _grid_graph(size: int, randomizer: random.Random) -> Graph[int]:
+    side: int = max(int(math.sqrt(size / 4)), 2)
+    vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(side * side)]
+    for row in range(side):
+        for column in range(side):
+            vertex: Vertex[int] = vertexes[row * side + column]
+            if column + 1 < side:
+                vertex.add_neighbor_bidirectional(vertexes[row * side + column + 1], randomizer.uniform(1.0, 10.0))
+            if row + 1 < side:
+                vertex.add_neighbor_bidirectional(vertexes[(row + 1) * side + column], randomizer.uniform(1.0, 10.0))
+    return Graph(vertexes)
+
+
+_GRAPH_GENERATORS: Dict[str, Callable[[int, random.Random], Graph[int]]] = {
+    "sparse": _sparse_graph,
+    "dense": _dense_graph,
+    "scale_free": _scale_free_graph,
+    "grid": _grid_graph,
+}
+
+
+def _avl_tree_insert_setup(key_generator: Callable[[int, random.Random], List[int]], append_optimized: bool = False) -> _SetupFunction:
+    def setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+        keys: List[int] = key_generator(size, randomizer)
+
+        def run() -> None:
+            tree: AVLTree[int, int] = AVLTree(append_optimized=append_optimized)
+            for key in keys:
+                tree.insert_node(key, key)
+
+        return run
+
+    return setup
+
+
+def _b_plus_tree_insert_setup(key_generator: Callable[[int, random.Random], List[int]]) -> _SetupFunction:
+    def setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+        keys: List[int] = key_generator(size, randomizer)
+
+        def run() -> None:
+            tree: BPlusTree[int, int] = BPlusTree()
+            for key in keys:
+                tree.insert_node(key, key)
+
+        return run
+
+    return setup
+
+
+def _tree_find_setup(key_generator: Callable[[int, random.Random], List[int]], tree_factory: Callable[[], _OrderedMap]) -> _SetupFunction:
+    def setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+        keys: List[int] = key_generator(size, randomizer)
+        tree: _OrderedMap = tree_factory()
+        for key in keys:
+            tree.insert_node(key, key)
+        queries: List[int] = [randomizer.randrange(-1, max(keys) + 2) for _ in range(min(size, QUERY_COUNT))]
+
+        def run() -> None:
+            for query in queries:
+                tree.find_max_value_less_than(query)
+
+        return run
+
+    return setup
+
+
+# Lookups of datetime keys (e.g. timestamps of transactions), whose comparisons are more expensive than int ones
+def _avl_tree_find_datetime_setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+    start: datetime = datetime(2017, 1, 1)
+    keys: List[datetime] = [start + timedelta(seconds=key) for key in _random_keys(size, randomizer)]
+    tree: AVLTree[datetime, int] = AVLTree()
+    for index, key in enumerate(keys):
+        tree.insert_node(key, index)
+    queries: List[datetime] = [start + timedelta(seconds=randomizer.randrange(size * 10)) for _ in range(min(size, QUERY_COUNT))]
+
+    def run() -> None:
+        for query in queries:
+            tree.find_max_value_less_than(query)
+
+    return run
+
+
+def _graph_search_setup(graph_generator: Callable[[int, random.Random], Graph[int]], algorithm: str) -> _SetupFunction:
+    def setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+        graph: Graph[int] = graph_generator(size, randomizer)
+        vertexes: List[Vertex[int]] = list(graph.vertexes)
+        pairs: List[List[Vertex[int]]] = [[randomizer.choice(vertexes), randomizer.choice(vertexes)] for _ in range(SEARCH_COUNT)]
+        search: Callable[[Vertex[int], Vertex[int]], object] = graph.dijkstra if algorithm == "dijkstra" else graph.breadth_first_search
+
+        def run() -> None:
+            for start, end in pairs:
+                search(start, end)
+
+        return run
+
+    return setup
+
+
+# The hierarchy is built in the untimed setup: only queries are timed
+def _contraction_hierarchy_search_setup(graph_generator: Callable[[int, random.Random], Graph[int]]) -> _SetupFunction:
+    def setup(size: int, randomizer: random.Random) -> Callable[[], None]:
+        graph: Graph[int] = graph_generator(size, randomizer)
+        vertexes: List[Vertex[int]] = list(graph.vertexes)
+        pairs: List[List[Vertex[int]]] = [[randomizer.choice(vertexes), randomizer.choice(vertexes)] for _ in range(SEARCH_COUNT)]
+        hierarchy: ContractionHierarchy[int] = ContractionHierarchy(graph)
+
+        def run() -> None:
+            for start, end in pairs:
+                hierarchy.shortest_path(start, end)
+
+        return run
+
+    return setup
+
+
+def _get_benchmarks() -> List[_Benchmark]:
+    result: List[_Benchmark] = []
+    for key_generator_name, key_generator in _KEY_GENERATORS.items():
+        result.append(_Benchmark(name=f"avl_tree.insert_node.{key_generator_name}", setup=_avl_tree_insert_setup(key_generator)))
+        result.append(
+            _Benchmark(name=f"avl_tree.insert_node.append_optimized.{key_generator_name}", setup=_avl_tree_insert_setup(key_generator, append_optimized=True))
+        )
+        result.append(_Benchmark(name=f"avl_tree.find_max_value_less_than.{key_generator_name}", setup=_tree_find_setup(key_generator, AVLTree)))
+        result.append(_Benchmark(name=f"b_plus_tree.insert_node.{key_generator_name}", setup=_b_plus_tree_insert_setup(key_generator)))
+        result.append(_Benchmark(name=f"b_plus_tree.find_max_value_less_than.{key_generator_name}", setup=_tree_find_setup(key_generator, BPlusTree)))
+    result.append(_Benchmark(name="avl_tree.find_max_value_less_than.datetime", setup=_avl_tree_find_datetime_setup))
+    for graph_generator_name, graph_generator in _GRAPH_GENERATORS.items():
+        max_size: Optional[int] = 1000000 if graph_generator_name == "dense" else None
+        for algorithm in ["dijkstra", "breadth_first_search"]:
+            result.append(
+                _Benchmark(name=f"graph.{algorithm}.{graph_generator_name}", setup=_graph_search_setup(graph_generator, algorithm), max_size=max_size)
+            )
+        result.append(
+            _Benchmark(
+                name=f"contraction_hierarchy.shortest_path.{graph_generator_name}",
+                setup=_contraction_hierarchy_search_setup(graph_generator),
+                max_size=max_size,
+            )
+        )
+    return result
+
+
+def _run_benchmark(benchmark: _Benchmark, size: int, repeat: int, seed: int) -> _Result:
+    run: Callable[[], None] = benchmark.setup(size, random.Random(seed))
+    timings: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return _Result(name=benchmark.name, size=size, repeat=repeat, minimum=min(timings), median=median(timings))
+
+
+# Prints the comparison with the baseline and returns the number of regressions (median slower than baseline by more than tolerance)
+def _compare(results: List[_Result], baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline: Dict[str, float] = {f"{result['name']}@{result['size']}": float(result["median"]) for result in json.load(baseline_file)["results"]}
+    regression_count: int = 0
+    print(f"\n{'benchmark':<60} {'size':>10} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for result in results:
+        key: str = f"{result.name}@{result.size}"
+        if key not in baseline:
+            print(f"{result.name:<60} {result.size:>10} {'-':>12} {result.median:>12.6f} {'-':>8}")
+            continue
+        ratio: float = result.median / baseline[key] if baseline[key] > 0 else math.inf
+        regressed: bool = ratio > 1.0 + tolerance
+        if regressed:
+            regression_count += 1
+        print(f"{result.name:<60} {result.size:>10} {baseline[key]:>12.6f} {result.median:>12.6f} {ratio:>7.2f}x{' REGRESSION' if regressed else ''}")
+    return regression_count
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Prezzemolo benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help=f"input sizes (keys or edges, default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help=f"timed runs per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"random seed for input generation (default: {DEFAULT_SEED})")
+    parser.add_argument("--filter", type=str, default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--output", type=str, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=str, help="compare results with this JSON file (written by --output)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help=f"relative slowdown reported as regression (default: {DEFAULT_TOLERANCE})")
+    args: argparse.Namespace = parser.parse_args()
+
+    results: List[_Result] = []
+    for benchmark in _get_benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+        for size in args.sizes:
+            if benchmark.max_size is not None and size > benchmark.max_size:
+                continue
+            result: _Result = _run_benchmark(benchmark, size, args.repeat, args.seed)
+            results.append(result)
+            print(f"{result.name:<60} {result.size:>10} min={result.minimum:.6f}s median={result.median:.6f}s", flush=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(
+                {
+                    "metadata": {
+                        "date": datetime.now().isoformat(),
+                        "python": sys.version,
+                        "platform": platform.platform(),
+                        "seed": args.seed,
+                        "repeat": args.repeat,
+                    },
+                    "results": [asdict(result) for result in results],
+                },
+                output_file,
+                indent=2,
+            )
+
+    if args.baseline and _compare(results, args.baseline, args.tolerance) > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
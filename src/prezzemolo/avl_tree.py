@@ -13,9 +13,17 @@
 # limitations under the License.
 
 
-from typing import Callable, Generic, List, Optional
+from bisect import bisect_right
+from io import StringIO
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Generic, List, Optional, TextIO, Tuple, Union
 
-from prezzemolo.utility import KeyType, ValueType, to_string
+from prezzemolo.instrumentation import Instrumentation, InstrumentationSample
+from prezzemolo.utility import TRUNCATION_MARKER, KeyType, ValueType, to_string
+
+# Default bound of to_string(), __str__() and __repr__(): larger trees are summarized (see render())
+DEFAULT_REPR_MAX_NODES: int = 100
 
 
 class AVLNode(Generic[KeyType, ValueType]):
@@ -27,23 +35,64 @@ class AVLNode(Generic[KeyType, ValueType]):
         self.__left: Optional[AVLNode[KeyType, ValueType]] = None
         self.__right: Optional[AVLNode[KeyType, ValueType]] = None
 
+    # Rendering is iterative (deep or large trees don't hit the recursion limit) and bounded by default: see render().
     def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
-        class_specific_data: List[str] = []
+        output: StringIO = StringIO()
+        self._render(output, repr_format, indent=indent, extra_data=extra_data, max_depth=None, max_nodes=DEFAULT_REPR_MAX_NODES)
+        return output.getvalue()
+
+    # Writes the subtree rooted at this node to output, in the same format as to_string(). Nodes deeper than max_depth
+    # (the root has depth 1) or beyond the first max_nodes (in pre-order) are written as TRUNCATION_MARKER.
+    def render(self, output: TextIO, repr_format: bool = True, *, max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> None:
+        self._render(output, repr_format, indent=0, extra_data=None, max_depth=max_depth, max_nodes=max_nodes)
+
+    def _render(
+        self, output: TextIO, repr_format: bool, *, indent: int, extra_data: Optional[List[str]], max_depth: Optional[int], max_nodes: Optional[int]
+    ) -> None:
+        if max_depth is not None and (not isinstance(max_depth, int) or max_depth < 1):
+            raise ValueError(f"max_depth must be a positive integer: {repr(max_depth)}")
+        if max_nodes is not None and (not isinstance(max_nodes, int) or max_nodes < 1):
+            raise ValueError(f"max_nodes must be a positive integer: {repr(max_nodes)}")
         stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
-        if repr_format:
-            class_specific_data.append(f"{type(self).__name__}(key={stringify(self.key)}")
-        else:
-            class_specific_data.append(f"{type(self).__name__}:")
-            class_specific_data.append(f"key={stringify(self.key)}")
-        class_specific_data.append(f"value={stringify(self.value)}")
-        class_specific_data.append(f"height={stringify(self.height)}")
-        class_specific_data.append(f"left={stringify(self.left)}")
-        class_specific_data.append(f"right={stringify(self.right)}")
-
-        if extra_data:
-            class_specific_data.extend(extra_data)
-
-        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+        separator: str = ", " if repr_format else "\n  "
+        # Explicit stack of text to write and of (node, depth) pairs to expand into their fields and children
+        stack: List[Union[str, Tuple[AVLNode[KeyType, ValueType], int]]] = [(self, 1)]
+        rendered_node_count: int = 0
+        while stack:
+            item: Union[str, Tuple[AVLNode[KeyType, ValueType], int]] = stack.pop()
+            if isinstance(item, str):
+                output.write(item)
+                continue
+            node, depth = item
+            if (max_depth is not None and depth > max_depth) or (max_nodes is not None and rendered_node_count >= max_nodes):
+                output.write(TRUNCATION_MARKER)
+                continue
+            rendered_node_count += 1
+            fields: List[str]
+            if repr_format:
+                fields = [f"{type(node).__name__}(key={stringify(node.key)}"]
+            else:
+                fields = [f"{type(node).__name__}:", f"key={stringify(node.key)}"]
+            fields.append(f"value={stringify(node.value)}")
+            fields.append(f"height={stringify(node.height)}")
+            trailing_fields: List[str] = node._get_extra_data(repr_format)  # pylint: disable=protected-access
+            # Padding follows utility.to_string(): only the top node is indented
+            padding: str = "  " * indent if node is self else ""
+            if node is self and extra_data:
+                trailing_fields.extend(extra_data)
+            if repr_format:
+                fields[0] = f"{padding}{fields[0]}"
+                padding = ""
+            output.write(separator.join(f"{padding}{field}" for field in fields))
+            output.write(f"{separator}{padding}left=")
+            stack.append("".join(f"{separator}{padding}{field}" for field in trailing_fields) + (")" if repr_format else ""))
+            stack.append((node.right, depth + 1) if node.right else "None")
+            stack.append(f"{separator}{padding}right=")
+            stack.append((node.left, depth + 1) if node.left else "None")
+
+    # Fields written after the children: subclasses add their own data here
+    def _get_extra_data(self, repr_format: bool) -> List[str]:  # pylint: disable=unused-argument
+        return []
 
     def __str__(self) -> str:
         return self.to_string(indent=0, repr_format=False)
@@ -59,6 +108,10 @@ class AVLNode(Generic[KeyType, ValueType]):
     def value(self) -> ValueType:
         return self.__value
 
+    @value.setter
+    def value(self, value: ValueType) -> None:
+        self.__value = value
+
     @property
     def left(self) -> "Optional[AVLNode[KeyType, ValueType]]":
         return self.__left
@@ -84,24 +137,97 @@ class AVLNode(Generic[KeyType, ValueType]):
         self.__height = height
 
 
+DEFAULT_APPEND_BATCH_SIZE: int = 256
+
+
+# In append-optimized mode (meant for streams of non-decreasing keys, such as live price feeds) keys that are not less than
+# the maximum key of the tree are stored in a sorted tail buffer, which is searched with bisect and merged into the tree
+# in batches of append_batch_size nodes: the batch is built into a perfectly balanced subtree in linear time and joined to
+# the tree along its right spine, so ingestion is amortized O(1) instead of O(log n) with a rotation every other insert.
+# Keys that are less than the maximum key of the tree are inserted as usual. flush() merges the tail buffer explicitly.
+# By default duplicate keys are kept (lookups return the last inserted one). In upsert mode inserting an existing key
+# updates its node in place instead, without restructuring the tree: the new value replaces the old one, or, if combine is
+# passed, the stored value becomes combine(old_value, new_value). The size of the tree is then bounded by the number of
+# distinct keys.
 class AVLTree(Generic[KeyType, ValueType]):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        instrumentation: Optional[Instrumentation] = None,
+        append_optimized: bool = False,
+        append_batch_size: int = DEFAULT_APPEND_BATCH_SIZE,
+        upsert: bool = False,
+        combine: Optional[Callable[[ValueType, ValueType], ValueType]] = None,
+    ) -> None:
+        if not isinstance(append_batch_size, int) or append_batch_size < 1:
+            raise ValueError(f"append_batch_size must be a positive integer: {repr(append_batch_size)}")
+        if combine is not None and not upsert:
+            raise ValueError("combine requires upsert mode")
         self.__root: Optional[AVLNode[KeyType, ValueType]] = None
+        self.__instrumentation: Optional[Instrumentation] = instrumentation
+        self.__rotation_count: int = 0
+        self.__append_optimized: bool = append_optimized
+        self.__append_batch_size: int = append_batch_size
+        # Tail buffer: all its keys are greater than or equal to the maximum key of the tree (tracked in __max_key)
+        self.__tail_keys: List[KeyType] = []
+        self.__tail_values: List[ValueType] = []
+        self.__max_key: Optional[KeyType] = None
+        self.__upsert: bool = upsert
+        self.__combine: Optional[Callable[[ValueType, ValueType], ValueType]] = combine
+        self.__size: int = 0
 
     def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
         class_specific_data: List[str] = []
         stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
         if repr_format:
-            class_specific_data.append(f"{type(self).__name__}(root={stringify(self.root)}")
+            class_specific_data.append(f"{type(self).__name__}(root={stringify(self.__root)}")
         else:
             class_specific_data.append(f"{type(self).__name__}:")
-            class_specific_data.append(f"root={stringify(self.root)}")
+            class_specific_data.append(f"root={stringify(self.__root)}")
+        if self.__tail_keys:
+            tail: StringIO = StringIO()
+            self._render_tail(tail, repr_format, DEFAULT_REPR_MAX_NODES)
+            class_specific_data.append(f"tail={tail.getvalue()}")
+        # Large trees are summarized: root is bounded by DEFAULT_REPR_MAX_NODES (see AVLNode.to_string())
+        if self.__size > DEFAULT_REPR_MAX_NODES:
+            class_specific_data.append(f"size={stringify(self.__size)}")
 
         if extra_data:
             class_specific_data.extend(extra_data)
 
         return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
 
+    # Streams the tree to output without building it in memory (see AVLNode.render() for max_depth and max_nodes). The
+    # output matches to_string(), except that size is written whenever nodes are left out. Rendering doesn't modify the
+    # tree: in append-optimized mode the tail buffer is written separately (as tail, bounded by max_nodes too).
+    def render(self, output: TextIO, repr_format: bool = True, *, max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> None:
+        if max_nodes is not None and (not isinstance(max_nodes, int) or max_nodes < 1):
+            raise ValueError(f"max_nodes must be a positive integer: {repr(max_nodes)}")
+        root: Optional[AVLNode[KeyType, ValueType]] = self.__root
+        separator: str = ", " if repr_format else "\n  "
+        is_truncated: bool = False
+        output.write(f"{type(self).__name__}(root=" if repr_format else f"{type(self).__name__}:\n  root=")
+        if root is None:
+            output.write("None")
+        else:
+            root.render(output, repr_format, max_depth=max_depth, max_nodes=max_nodes)
+            is_truncated = (max_depth is not None and root.height > max_depth) or (max_nodes is not None and self.__size - len(self.__tail_keys) > max_nodes)
+        if self.__tail_keys:
+            output.write(f"{separator}tail=")
+            self._render_tail(output, repr_format, max_nodes)
+            is_truncated = is_truncated or (max_nodes is not None and len(self.__tail_keys) > max_nodes)
+        if is_truncated:
+            output.write(f"{separator}size={self.__size}")
+        if repr_format:
+            output.write(")")
+
+    # Writes the first max_nodes (key, value) pairs of the tail buffer
+    def _render_tail(self, output: TextIO, repr_format: bool, max_nodes: Optional[int]) -> None:
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        items: List[str] = [f"({stringify(key)}, {stringify(value)})" for key, value in islice(zip(self.__tail_keys, self.__tail_values), max_nodes)]
+        if len(items) < len(self.__tail_keys):
+            items.append(TRUNCATION_MARKER)
+        output.write(f"[{', '.join(items)}]")
+
     def __str__(self) -> str:
         return self.to_string(indent=0, repr_format=False)
 
@@ -110,44 +236,210 @@ class AVLTree(Generic[KeyType, ValueType]):
 
     def find_max_value_less_than(self, key: KeyType) -> Optional[ValueType]:
         result: Optional[AVLNode[KeyType, ValueType]]
-        result = self.find_max_node_less_than_at_node(self.__root, key) if self.__root else None
+        try:
+            is_in_tail: bool = bool(self.__tail_keys) and not key < self.__tail_keys[0]
+        except TypeError as exc:
+            raise TypeError("AVLTree: keys are not comparable") from exc
+        if is_in_tail:
+            start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+            # bisect_right() finds the last of duplicate keys, consistently with the tree descent
+            value: ValueType = self.__tail_values[bisect_right(self.__tail_keys, key) - 1]
+            if self.__instrumentation is not None:
+                self.__instrumentation.record(
+                    InstrumentationSample(operation="find_max_value_less_than", duration=perf_counter() - start_time, counters={"tail_hits": 1})
+                )
+            return value
+        if self.__instrumentation is not None:
+            result = self._find_max_node_less_than_instrumented(self.__instrumentation, key)
+        else:
+            result = self.find_max_node_less_than_at_node(self.__root, key) if self.__root else None
         return result.value if result is not None else None
 
     def insert_node(self, key: KeyType, value: ValueType) -> None:
-        new_node: AVLNode[KeyType, ValueType]
-        new_node = self.insert_node_at_node(self.__root, key, value)
-        if self.__root != new_node:
-            self.__root = new_node
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        rotation_count: int = self.__rotation_count
+        if self.__upsert and self._update_existing_node(key, value):
+            pass
+        elif self.__append_optimized:
+            self._insert_node_append_optimized(key, value)
+            self.__size += 1
+        else:
+            new_node: AVLNode[KeyType, ValueType]
+            new_node = self.insert_node_at_node(self.__root, key, value)
+            if self.__root != new_node:
+                self.__root = new_node
+            self.__size += 1
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="insert_node",
+                    duration=perf_counter() - start_time,
+                    counters={"rotations": self.__rotation_count - rotation_count},
+                    high_water_marks={"height": self._get_height(self.__root)},
+                )
+            )
+
+    # Merges the tail buffer into the tree (append-optimized mode only: otherwise the buffer is always empty).
+    def flush(self) -> None:
+        if not self.__tail_keys:
+            return
+        if self.__root is None:
+            self.__root = self._build_balanced_subtree(0, len(self.__tail_keys))
+        else:
+            link: AVLNode[KeyType, ValueType] = self._create_node(self.__tail_keys[0], self.__tail_values[0])
+            self.__root = self._join(self.__root, link, self._build_balanced_subtree(1, len(self.__tail_keys)))
+        self.__max_key = self.__tail_keys[-1]
+        self.__tail_keys = []
+        self.__tail_values = []
+
+    # Upsert mode: if key is already in the tree (or in the tail buffer) updates its value in place and returns True.
+    def _update_existing_node(self, key: KeyType, value: ValueType) -> bool:
+        tail_keys: List[KeyType] = self.__tail_keys
+        if tail_keys and not key < tail_keys[0]:
+            index: int = bisect_right(tail_keys, key) - 1
+            if tail_keys[index] < key:
+                return False
+            self.__tail_values[index] = value if self.__combine is None else self.__combine(self.__tail_values[index], value)
+            return True
+        node: Optional[AVLNode[KeyType, ValueType]] = self.find_max_node_less_than_at_node(self.__root, key) if self.__root else None
+        if node is None or node.key < key:
+            return False
+        node.value = value if self.__combine is None else self.__combine(node.value, value)
+        return True
+
+    def _insert_node_append_optimized(self, key: KeyType, value: ValueType) -> None:
+        tail_keys: List[KeyType] = self.__tail_keys
+        if self.__max_key is not None and key < self.__max_key:
+            # Tail keys are all greater than key: they are not affected by the insertion
+            self.__root = self.insert_node_at_node(self.__root, key, value)
+            return
+        if not tail_keys or not key < tail_keys[-1]:
+            tail_keys.append(key)
+            self.__tail_values.append(value)
+        else:
+            index: int = bisect_right(tail_keys, key)
+            tail_keys.insert(index, key)
+            self.__tail_values.insert(index, value)
+        if len(tail_keys) >= self.__append_batch_size:
+            self.flush()
+
+    # Builds a perfectly balanced subtree out of the tail buffer slice [start, end)
+    def _build_balanced_subtree(self, start: int, end: int) -> Optional[AVLNode[KeyType, ValueType]]:
+        if start >= end:
+            return None
+        middle: int = (start + end) // 2
+        result: AVLNode[KeyType, ValueType] = self._create_node(self.__tail_keys[middle], self.__tail_values[middle])
+        result.left = self._build_balanced_subtree(start, middle)
+        result.right = self._build_balanced_subtree(middle + 1, end)
+        self._update_node(result)
+        return result
 
+    # Joins left, link and right (in key order) in O(|height difference|), by linking right to the right spine of left or
+    # vice versa.
+    def _join(
+        self, left: AVLNode[KeyType, ValueType], link: AVLNode[KeyType, ValueType], right: Optional[AVLNode[KeyType, ValueType]]
+    ) -> AVLNode[KeyType, ValueType]:
+        if self._get_height(right) > self._get_height(left) + 1:
+            # Disable mypy on the next line: right is not None because it is taller than left.
+            return self._join_left(left, link, right)  # type: ignore
+        return self._join_right(left, link, right)
+
+    # Descends the right spine of left until a subtree of height close to that of right is found, then links them.
+    def _join_right(
+        self, left: AVLNode[KeyType, ValueType], link: AVLNode[KeyType, ValueType], right: Optional[AVLNode[KeyType, ValueType]]
+    ) -> AVLNode[KeyType, ValueType]:
+        if self._get_height(left) <= self._get_height(right) + 1:
+            link.left = left
+            link.right = right
+            self._update_node(link)
+            return link
+        # Disable mypy on the next line: left.right is not None because left is taller than right + 1.
+        left.right = self._join_right(left.right, link, right)  # type: ignore
+        self._update_node(left)
+        return self._rebalance(left)
+
+    # Mirror image of _join_right(): descends the left spine of right.
+    def _join_left(
+        self, left: Optional[AVLNode[KeyType, ValueType]], link: AVLNode[KeyType, ValueType], right: AVLNode[KeyType, ValueType]
+    ) -> AVLNode[KeyType, ValueType]:
+        if self._get_height(right) <= self._get_height(left) + 1:
+            link.left = left
+            link.right = right
+            self._update_node(link)
+            return link
+        # Disable mypy on the next line: right.left is not None because right is taller than left + 1.
+        right.left = self._join_left(left, link, right.left)  # type: ignore
+        self._update_node(right)
+        return self._rebalance(right)
+
+    # Restores the AVL invariant of a node whose subtrees are balanced and differ in height by at most 2.
+    def _rebalance(self, root: AVLNode[KeyType, ValueType]) -> AVLNode[KeyType, ValueType]:
+        balance_factor: int = self._get_balance_factor(root)
+        # Disable mypy on the next few lines: children on the taller side are guaranteed not to be None.
+        if balance_factor > 1:
+            if self._get_balance_factor(root.left) < 0:  # type: ignore
+                root.left = self._rotate_left(root.left)  # type: ignore
+            return self._rotate_right(root)
+        if balance_factor < -1:
+            if self._get_balance_factor(root.right) > 0:  # type: ignore
+                root.right = self._rotate_right(root.right)  # type: ignore
+            return self._rotate_left(root)
+        return root
+
+    # Same as find_max_node_less_than_at_node(), but also counts key comparisons and visited levels.
+    def _find_max_node_less_than_instrumented(self, instrumentation: Instrumentation, key: KeyType) -> Optional[AVLNode[KeyType, ValueType]]:
+        start_time: float = perf_counter()
+        depth: int = 0
+        current_node: Optional[AVLNode[KeyType, ValueType]] = self.__root
+        result: Optional[AVLNode[KeyType, ValueType]] = None
+        try:
+            while current_node is not None:
+                depth += 1
+                if key < current_node.key:
+                    current_node = current_node.left
+                else:
+                    result = current_node
+                    current_node = current_node.right
+        except TypeError as exc:
+            raise TypeError("AVLTree: keys are not comparable") from exc
+        instrumentation.record(
+            InstrumentationSample(
+                operation="find_max_value_less_than",
+                duration=perf_counter() - start_time,
+                # The descent does exactly one comparison per level
+                counters={"comparisons": depth},
+                high_water_marks={"depth": depth},
+            )
+        )
+        return result
+
+    # Floor lookup: returns the node with the largest key less than or equal to key (with duplicate keys, the last inserted
+    # one). The descent does a single comparison per level, which matters for key types with expensive comparisons.
     @staticmethod
     def find_max_node_less_than_at_node(root: AVLNode[KeyType, ValueType], key: KeyType) -> Optional[AVLNode[KeyType, ValueType]]:
         current_node: Optional[AVLNode[KeyType, ValueType]] = root
         result: Optional[AVLNode[KeyType, ValueType]] = None
-        while current_node is not None:
-            current_key: KeyType = current_node.key
-            try:
-                if current_key > key:
+        try:
+            while current_node is not None:
+                if key < current_node.key:
                     current_node = current_node.left
-                elif current_key < key:
+                else:
                     result = current_node
                     current_node = current_node.right
-                elif current_key == key:
-                    result = current_node
-                    break
-            except TypeError as exc:
-                raise TypeError("AVLTree: keys are not comparable") from exc
+        except TypeError as exc:
+            raise TypeError("AVLTree: keys are not comparable") from exc
         return result
 
     def insert_node_at_node(self, root: Optional[AVLNode[KeyType, ValueType]], key: KeyType, value: ValueType) -> AVLNode[KeyType, ValueType]:
         if not root:
-            return AVLNode(key, value)
+            return self._create_node(key, value)
 
         if key < root.key:
             root.left = self.insert_node_at_node(root.left, key, value)
         else:
             root.right = self.insert_node_at_node(root.right, key, value)
 
-        root.height = 1 + max(self._get_height(root.left), self._get_height(root.right))
+        self._update_node(root)
 
         balance_factor: int = self._get_balance_factor(root)
         if balance_factor > 1:
@@ -160,7 +452,8 @@ class AVLTree(Generic[KeyType, ValueType]):
         if balance_factor < -1:
             # Disable mypy on the next few lines: it complains about root.right possibly being None (and therefore not having
             # attribute "key"). However since balance_factor is < -1 root.right is guaranteed not to be None.
-            if key > root.right.key:  # type: ignore
+            # Equal keys are inserted to the right, so the right-right case includes key == root.right.key
+            if not key < root.right.key:  # type: ignore
                 return self._rotate_left(root)
             root.right = self._rotate_right(root.right)  # type: ignore
             return self._rotate_left(root)
@@ -171,23 +464,33 @@ class AVLTree(Generic[KeyType, ValueType]):
     def _rotate_left(self, root: AVLNode[KeyType, ValueType]) -> AVLNode[KeyType, ValueType]:
         # Disable mypy on the next few lines: it complains that variables possibly being None (and therefore not having accessible
         # attributes). However unless there is a bug, this should never occur.
+        self.__rotation_count += 1
         pivot: Optional[AVLNode[KeyType, ValueType]] = root.right
         root.right = pivot.left  # type: ignore
         pivot.left = root  # type: ignore
-        root.height = 1 + max(self._get_height(root.left), self._get_height(root.right))  # type: ignore
-        pivot.height = 1 + max(self._get_height(pivot.left), self._get_height(pivot.right))  # type: ignore
+        self._update_node(root)
+        self._update_node(pivot)  # type: ignore
         return pivot  # type: ignore
 
     def _rotate_right(self, root: AVLNode[KeyType, ValueType]) -> AVLNode[KeyType, ValueType]:
         # Disable mypy on the next few lines: it complains that variables possibly being None (and therefore not having accessible
         # attributes). However unless there is a bug, this should never occur.
+        self.__rotation_count += 1
         pivot: Optional[AVLNode[KeyType, ValueType]] = root.left
         root.left = pivot.right  # type: ignore
         pivot.right = root  # type: ignore
-        root.height = 1 + max(self._get_height(root.left), self._get_height(root.right))  # type: ignore
-        pivot.height = 1 + max(self._get_height(pivot.left), self._get_height(pivot.right))  # type: ignore
+        self._update_node(root)
+        self._update_node(pivot)  # type: ignore
         return pivot  # type: ignore
 
+    # Extension points for augmented trees (e.g. IntervalTree): _create_node() can return an AVLNode subclass and
+    # _update_node() is called bottom-up on every node whose subtree changed, to recompute height and augmented data.
+    def _create_node(self, key: KeyType, value: ValueType) -> AVLNode[KeyType, ValueType]:
+        return AVLNode(key, value)
+
+    def _update_node(self, node: AVLNode[KeyType, ValueType]) -> None:
+        node.height = 1 + max(self._get_height(node.left), self._get_height(node.right))
+
     @staticmethod
     def _get_height(root: Optional[AVLNode[KeyType, ValueType]]) -> int:
         return root.height if root else 0
@@ -195,6 +498,24 @@ class AVLTree(Generic[KeyType, ValueType]):
     def _get_balance_factor(self, root: AVLNode[KeyType, ValueType]) -> int:
         return self._get_height(root.left) - self._get_height(root.right) if root else 0
 
+    # Root of the tree, which doesn't include the tail buffer in append-optimized mode: call flush() first to merge it.
     @property
     def root(self) -> Optional[AVLNode[KeyType, ValueType]]:
         return self.__root
+
+    # Number of nodes (including the ones in the tail buffer). Not exposed as __len__(), which would make empty trees falsy.
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    @property
+    def append_optimized(self) -> bool:
+        return self.__append_optimized
+
+    @property
+    def upsert(self) -> bool:
+        return self.__upsert
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        return self.__instrumentation
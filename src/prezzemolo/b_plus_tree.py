@@ -0,0 +1,273 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from bisect import bisect_left, bisect_right
+from time import perf_counter
+from typing import Callable, Generic, Iterator, List, Optional, Tuple, Union
+
+from prezzemolo.instrumentation import Instrumentation, InstrumentationSample
+from prezzemolo.utility import KeyType, ValueType, to_string
+
+DEFAULT_FANOUT: int = 64
+
+
+# Leaf node: sorted keys with their values and a link to the next leaf, used by sequential scans.
+class BPlusTreeLeaf(Generic[KeyType, ValueType]):
+    def __init__(self, keys: List[KeyType], values: List[ValueType]) -> None:
+        self.__keys: List[KeyType] = keys
+        self.__values: List[ValueType] = values
+        self.__next: Optional[BPlusTreeLeaf[KeyType, ValueType]] = None
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(keys={stringify(self.keys)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"keys={stringify(self.keys)}")
+        class_specific_data.append(f"values={stringify(self.values)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    @property
+    def keys(self) -> List[KeyType]:
+        return self.__keys
+
+    @property
+    def values(self) -> List[ValueType]:
+        return self.__values
+
+    @property
+    def next(self) -> "Optional[BPlusTreeLeaf[KeyType, ValueType]]":
+        return self.__next
+
+    @next.setter
+    def next(self, leaf: "Optional[BPlusTreeLeaf[KeyType, ValueType]]") -> None:
+        self.__next = leaf
+
+
+# Internal node: children[i] contains the keys k such that keys[i - 1] <= k < keys[i] (keys[i] is the first key of
+# children[i + 1]).
+class BPlusTreeInternalNode(Generic[KeyType, ValueType]):
+    def __init__(self, keys: List[KeyType], children: "List[Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]]]") -> None:
+        self.__keys: List[KeyType] = keys
+        self.__children: List[Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]]] = children
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(keys={stringify(self.keys)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"keys={stringify(self.keys)}")
+        class_specific_data.append(f"children={stringify(self.children)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    @property
+    def keys(self) -> List[KeyType]:
+        return self.__keys
+
+    @property
+    def children(self) -> "List[Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]]]":
+        return self.__children
+
+
+# Ordered map with the same interface as AVLTree, stored in a B+ tree: each node holds up to fanout keys in a Python list
+# (searched with bisect, which runs in C), so the tree is much shallower than a binary tree (3 levels for 10M keys with the
+# default fanout) and lookups do far fewer attribute accesses. Values live only in leaves, which are linked to one another
+# for fast sequential scans. As in AVLTree, duplicate keys are allowed and lookups return the last inserted one.
+class BPlusTree(Generic[KeyType, ValueType]):
+    def __init__(self, fanout: int = DEFAULT_FANOUT, instrumentation: Optional[Instrumentation] = None) -> None:
+        if not isinstance(fanout, int) or fanout < 3:
+            raise ValueError(f"fanout must be an integer greater than 2: {repr(fanout)}")
+        self.__fanout: int = fanout
+        self.__instrumentation: Optional[Instrumentation] = instrumentation
+        self.__first_leaf: BPlusTreeLeaf[KeyType, ValueType] = BPlusTreeLeaf([], [])
+        self.__root: Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]] = self.__first_leaf
+        self.__height: int = 1
+        self.__size: int = 0
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(fanout={stringify(self.fanout)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"fanout={stringify(self.fanout)}")
+        class_specific_data.append(f"root={stringify(self.root)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def find_max_value_less_than(self, key: KeyType) -> Optional[ValueType]:
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        node: Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]] = self.__root
+        try:
+            while isinstance(node, BPlusTreeInternalNode):
+                node = node.children[bisect_right(node.keys, key)]
+            index: int = bisect_right(node.keys, key) - 1
+        except TypeError as exc:
+            raise TypeError("BPlusTree: keys are not comparable") from exc
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(operation="find_max_value_less_than", duration=perf_counter() - start_time, high_water_marks={"depth": self.__height})
+            )
+        # The first key of every leaf but the leftmost one is the separator that led to it, so it is less than or equal to key:
+        # index can only be negative in the leftmost leaf, where no smaller key exists.
+        return node.values[index] if index >= 0 else None
+
+    def insert_node(self, key: KeyType, value: ValueType) -> None:
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        split_count: int = 0
+        path: List[BPlusTreeInternalNode[KeyType, ValueType]] = []
+        child_indexes: List[int] = []
+        node: Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]] = self.__root
+        try:
+            while isinstance(node, BPlusTreeInternalNode):
+                child_index: int = bisect_right(node.keys, key)
+                path.append(node)
+                child_indexes.append(child_index)
+                node = node.children[child_index]
+            # Inserting after equal keys makes lookups return the last inserted duplicate
+            index: int = bisect_right(node.keys, key)
+        except TypeError as exc:
+            raise TypeError("BPlusTree: keys are not comparable") from exc
+        node.keys.insert(index, key)
+        node.values.insert(index, value)
+        self.__size += 1
+
+        if len(node.keys) > self.__fanout:
+            split_count += 1
+            separator: KeyType
+            new_node: Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]]
+            # Keys appended at the end of the tree (e.g. increasing timestamps) only ever land in the rightmost nodes
+            appending: bool = index == len(node.keys) - 1 and node.next is None
+            separator, new_node = self._split_leaf(node, appending)
+            # Propagate the split upwards
+            while path:
+                parent: BPlusTreeInternalNode[KeyType, ValueType] = path.pop()
+                child_index = child_indexes.pop()
+                parent.keys.insert(child_index, separator)
+                parent.children.insert(child_index + 1, new_node)
+                if len(parent.children) <= self.__fanout:
+                    break
+                split_count += 1
+                separator, new_node = self._split_internal_node(parent, appending)
+            else:
+                self.__root = BPlusTreeInternalNode([separator], [self.__root, new_node])
+                self.__height += 1
+
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="insert_node",
+                    duration=perf_counter() - start_time,
+                    counters={"splits": split_count},
+                    high_water_marks={"height": self.__height},
+                )
+            )
+
+    # Yields (key, value) pairs in key order, with start_key <= key < end_key (None means unbounded), following leaf links.
+    def items(self, start_key: Optional[KeyType] = None, end_key: Optional[KeyType] = None) -> Iterator[Tuple[KeyType, ValueType]]:
+        leaf: Optional[BPlusTreeLeaf[KeyType, ValueType]] = self.__first_leaf
+        index: int = 0
+        if start_key is not None:
+            node: Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]] = self.__root
+            # bisect_left() leads to the leftmost leaf that can contain start_key (duplicates can span several leaves)
+            while isinstance(node, BPlusTreeInternalNode):
+                node = node.children[bisect_left(node.keys, start_key)]
+            leaf = node
+            index = bisect_left(node.keys, start_key)
+        while leaf is not None:
+            keys: List[KeyType] = leaf.keys
+            values: List[ValueType] = leaf.values
+            while index < len(keys):
+                if end_key is not None and not keys[index] < end_key:
+                    return
+                yield keys[index], values[index]
+                index += 1
+            leaf = leaf.next
+            index = 0
+
+    # Splits an overflowing leaf and returns the separator and the new right sibling. When keys are appended at the end of
+    # the tree the left leaf is kept full, so that sequential ingestion doesn't leave half-empty nodes behind.
+    def _split_leaf(self, leaf: BPlusTreeLeaf[KeyType, ValueType], appending: bool) -> Tuple[KeyType, BPlusTreeLeaf[KeyType, ValueType]]:
+        middle: int = len(leaf.keys) - 1 if appending else len(leaf.keys) // 2
+        new_leaf: BPlusTreeLeaf[KeyType, ValueType] = BPlusTreeLeaf(leaf.keys[middle:], leaf.values[middle:])
+        del leaf.keys[middle:]
+        del leaf.values[middle:]
+        new_leaf.next = leaf.next
+        leaf.next = new_leaf
+        return new_leaf.keys[0], new_leaf
+
+    # Splits an overflowing internal node and returns the separator moved up to the parent and the new right sibling (which,
+    # like in _split_leaf(), gets a single child when appending).
+    @staticmethod
+    def _split_internal_node(node: BPlusTreeInternalNode[KeyType, ValueType], appending: bool) -> Tuple[KeyType, BPlusTreeInternalNode[KeyType, ValueType]]:
+        middle: int = len(node.children) - 1 if appending else len(node.children) // 2
+        separator: KeyType = node.keys[middle - 1]
+        new_node: BPlusTreeInternalNode[KeyType, ValueType] = BPlusTreeInternalNode(node.keys[middle:], node.children[middle:])
+        del node.keys[middle - 1 :]
+        del node.children[middle:]
+        return separator, new_node
+
+    @property
+    def root(self) -> Union[BPlusTreeInternalNode[KeyType, ValueType], BPlusTreeLeaf[KeyType, ValueType]]:
+        return self.__root
+
+    @property
+    def fanout(self) -> int:
+        return self.__fanout
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        return self.__instrumentation
@@ -0,0 +1,337 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Set, Tuple
+
+from prezzemolo.graph import Graph
+from prezzemolo.utility import ValueType, to_string
+from prezzemolo.vertex import Vertex
+
+# Witness searches are local: they stop after settling this many vertexes. A witness that isn't found only causes an
+# unnecessary shortcut, so the limit trades preprocessing time for hierarchy size without affecting correctness.
+WITNESS_SEARCH_SETTLED_LIMIT: int = 64
+DEFAULT_CORE_AVERAGE_DEGREE_LIMIT: int = 16
+
+# (source, target, weight)
+_Shortcut = Tuple[int, int, float]
+
+
+# Contraction hierarchy: a preprocessed snapshot of a Graph with non-negative weights that answers point-to-point shortest
+# path queries much faster than Graph.dijkstra() on road-network-like graphs. Vertexes are contracted one at a time in order
+# of importance (edge difference plus number of contracted neighbors plus level, updated lazily): contracting a vertex
+# removes it from the remaining graph and adds a shortcut between each pair of its neighbors, unless a witness search finds
+# a path that is at least as short. Queries run a bidirectional Dijkstra that only follows edges towards more important
+# vertexes, and shortcuts are unpacked into the original vertexes at the end. Contraction stops when the remaining graph
+# has more than core_average_degree_limit edges per vertex: in graphs without small separators (e.g. random graphs) the
+# last vertexes form a dense core where contraction would add a quadratic number of shortcuts, so the core is left as is
+# and searched by both directions of the query. The hierarchy doesn't track changes: adding edges to the graph makes it
+# stale (queries raise ValueError) and a new ContractionHierarchy must be built.
+class ContractionHierarchy(Generic[ValueType]):
+    def __init__(self, graph: Graph[ValueType], core_average_degree_limit: int = DEFAULT_CORE_AVERAGE_DEGREE_LIMIT) -> None:
+        if not isinstance(graph, Graph):
+            raise TypeError(f"graph is not a Graph: {repr(graph)}")
+        if not isinstance(core_average_degree_limit, int) or core_average_degree_limit < 1:
+            raise ValueError(f"core_average_degree_limit must be a positive integer: {repr(core_average_degree_limit)}")
+        self.__graph: Graph[ValueType] = graph
+        self.__core_average_degree_limit: int = core_average_degree_limit
+        self.__vertexes: List[Vertex[ValueType]] = list(graph.vertexes)
+        self.__vertex_2_index: Dict[Vertex[ValueType], int] = {vertex: index for index, vertex in enumerate(self.__vertexes)}
+        self.__core_vertex_count: int = 0
+        # Upward edges of each vertex, i.e. edges (original or shortcut) leading to / coming from a more important vertex:
+        # the forward search follows outgoing ones and the backward search follows incoming ones.
+        self.__upward_out_edges: List[List[Tuple[int, float]]] = []
+        self.__upward_in_edges: List[List[Tuple[int, float]]] = []
+        # Middle vertex of each shortcut (source, target): shortcuts are unpacked recursively into (source, middle) and (middle, target)
+        self.__shortcut_2_middle: Dict[Tuple[int, int], int] = {}
+        self.__is_stale: bool = False
+        self._build()
+        for vertex in self.__vertexes:
+            vertex.add_neighbor_observer(self._on_neighbor_added)
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(graph={stringify(self.graph)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"graph={stringify(self.graph)}")
+        class_specific_data.append(f"vertex_count={stringify(len(self.__vertexes))}")
+        class_specific_data.append(f"shortcut_count={stringify(self.shortcut_count)}")
+        class_specific_data.append(f"core_vertex_count={stringify(self.core_vertex_count)}")
+        class_specific_data.append(f"is_stale={stringify(self.is_stale)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    def __contains__(self, vertex: Vertex[ValueType]) -> bool:
+        return vertex in self.__vertex_2_index
+
+    @property
+    def graph(self) -> Graph[ValueType]:
+        return self.__graph
+
+    @property
+    def shortcut_count(self) -> int:
+        return len(self.__shortcut_2_middle)
+
+    @property
+    def core_average_degree_limit(self) -> int:
+        return self.__core_average_degree_limit
+
+    # Number of vertexes left uncontracted (see core_average_degree_limit)
+    @property
+    def core_vertex_count(self) -> int:
+        return self.__core_vertex_count
+
+    # True if edges were added to the graph after the hierarchy was built
+    @property
+    def is_stale(self) -> bool:
+        return self.__is_stale
+
+    def _on_neighbor_added(self, _vertex: Vertex[ValueType], _neighbor: Vertex[ValueType]) -> None:
+        self.__is_stale = True
+
+    def _build(self) -> None:  # pylint: disable=too-many-branches
+        vertex_count: int = len(self.__vertexes)
+        # Remaining graph: edges among vertexes that haven't been contracted yet (parallel edges keep the minimum weight)
+        out_edges: List[Dict[int, float]] = [{} for _ in range(vertex_count)]
+        in_edges: List[Dict[int, float]] = [{} for _ in range(vertex_count)]
+        edge_count: int = 0
+        for index, vertex in enumerate(self.__vertexes):
+            for neighbor in vertex.neighbors:
+                if neighbor not in self.__vertex_2_index:
+                    raise ValueError(f"Vertex '{vertex.name}' has neighbor '{neighbor.name}' that wasn't added to the graph")
+                weight: float = vertex.get_weight(neighbor)
+                if weight < 0.0:
+                    raise ValueError(
+                        f"Edge '{vertex.name}' -> '{neighbor.name}' has negative weight {weight}: contraction hierarchies require non-negative weights"
+                    )
+                neighbor_index: int = self.__vertex_2_index[neighbor]
+                # Self loops are never part of a shortest path
+                if neighbor_index != index:
+                    out_edges[index][neighbor_index] = weight
+                    in_edges[neighbor_index][index] = weight
+                    edge_count += 1
+
+        self.__upward_out_edges = [[] for _ in range(vertex_count)]
+        self.__upward_in_edges = [[] for _ in range(vertex_count)]
+        contracted_neighbor_counts: List[int] = [0] * vertex_count
+        # Level of a vertex: 1 + maximum level of its contracted neighbors (bounds the depth of the hierarchy)
+        levels: List[int] = [0] * vertex_count
+        queue: List[Tuple[int, int]] = [(0, index) for index in range(vertex_count)]
+        if edge_count <= self.__core_average_degree_limit * vertex_count:
+            queue = [
+                (
+                    self._get_priority(
+                        self._find_shortcuts(index, out_edges, in_edges),
+                        len(out_edges[index]) + len(in_edges[index]),
+                        contracted_neighbor_counts[index],
+                        levels[index],
+                    ),
+                    index,
+                )
+                for index in range(vertex_count)
+            ]
+            heapify(queue)
+        while queue and edge_count <= self.__core_average_degree_limit * len(queue):
+            _, index = heappop(queue)
+            shortcuts: List[_Shortcut] = self._find_shortcuts(index, out_edges, in_edges)
+            # Lazy update: priorities of the remaining vertexes may have grown since they were queued, so the popped vertex
+            # is contracted only if its current priority is still the smallest.
+            priority: int = self._get_priority(shortcuts, len(out_edges[index]) + len(in_edges[index]), contracted_neighbor_counts[index], levels[index])
+            if queue and priority > queue[0][0]:
+                heappush(queue, (priority, index))
+                continue
+
+            # All neighbors in the remaining graph are contracted later, so they are more important than this vertex
+            self.__upward_out_edges[index] = list(out_edges[index].items())
+            self.__upward_in_edges[index] = list(in_edges[index].items())
+            edge_count -= len(out_edges[index]) + len(in_edges[index])
+            neighbor_indexes: Set[int] = set(out_edges[index])
+            neighbor_indexes.update(in_edges[index])
+            for target in out_edges[index]:
+                del in_edges[target][index]
+            for source in in_edges[index]:
+                del out_edges[source][index]
+            for neighbor_index in neighbor_indexes:
+                contracted_neighbor_counts[neighbor_index] += 1
+                levels[neighbor_index] = max(levels[neighbor_index], levels[index] + 1)
+            out_edges[index].clear()
+            in_edges[index].clear()
+            for source, target, weight in shortcuts:
+                if weight < out_edges[source].get(target, float("inf")):
+                    if target not in out_edges[source]:
+                        edge_count += 1
+                    out_edges[source][target] = weight
+                    in_edges[target][source] = weight
+                    self.__shortcut_2_middle[(source, target)] = index
+
+        # Core vertexes (if any) are all equally important: both searches follow all the edges among them
+        self.__core_vertex_count = len(queue)
+        for _, index in queue:
+            self.__upward_out_edges[index] = list(out_edges[index].items())
+            self.__upward_in_edges[index] = list(in_edges[index].items())
+
+    # Edge difference plus number of contracted neighbors plus level: vertexes with lower priority are contracted first
+    @staticmethod
+    def _get_priority(shortcuts: List[_Shortcut], edge_count: int, contracted_neighbor_count: int, level: int) -> int:
+        return len(shortcuts) - edge_count + contracted_neighbor_count + level
+
+    # Returns the shortcuts needed to preserve shortest path distances if the vertex were contracted
+    @classmethod
+    def _find_shortcuts(cls, index: int, out_edges: List[Dict[int, float]], in_edges: List[Dict[int, float]]) -> List[_Shortcut]:
+        result: List[_Shortcut] = []
+        outgoing_edges: Dict[int, float] = out_edges[index]
+        if not outgoing_edges:
+            return result
+        infinity: float = float("inf")
+        max_out_weight: float = max(outgoing_edges.values())
+        for source, in_weight in in_edges[index].items():
+            distance: Dict[int, float] = cls._witness_search(source, index, in_weight + max_out_weight, outgoing_edges, out_edges)
+            for target, out_weight in outgoing_edges.items():
+                if target != source and distance.get(target, infinity) > in_weight + out_weight:
+                    result.append((source, target, in_weight + out_weight))
+        return result
+
+    # Local Dijkstra from source that avoids the vertex being contracted and stops when all targets are settled: returns
+    # upper bounds of witness path lengths.
+    @staticmethod
+    def _witness_search(source: int, excluded: int, max_distance: float, targets: Dict[int, float], out_edges: List[Dict[int, float]]) -> Dict[int, float]:
+        infinity: float = float("inf")
+        distance: Dict[int, float] = {source: 0.0}
+        queue: List[Tuple[float, int]] = [(0.0, source)]
+        settled_count: int = 0
+        unsettled_target_count: int = len(targets)
+        while queue and settled_count < WITNESS_SEARCH_SETTLED_LIMIT:
+            current_distance, current = heappop(queue)
+            if current_distance > distance[current]:
+                continue
+            settled_count += 1
+            if current in targets:
+                unsettled_target_count -= 1
+                if unsettled_target_count == 0:
+                    break
+            for neighbor, weight in out_edges[current].items():
+                new_distance: float = current_distance + weight
+                if new_distance <= max_distance and neighbor != excluded and new_distance < distance.get(neighbor, infinity):
+                    distance[neighbor] = new_distance
+                    heappush(queue, (new_distance, neighbor))
+        return distance
+
+    def _check_query(self, start: Vertex[ValueType], end: Vertex[ValueType]) -> None:
+        if not isinstance(start, Vertex):
+            raise TypeError(f"start is not a Vertex: {repr(start)}")
+        if not isinstance(end, Vertex):
+            raise TypeError(f"end is not a Vertex: {repr(end)}")
+        if self.__is_stale:
+            raise ValueError("The graph has changed since the contraction hierarchy was built: build a new ContractionHierarchy")
+        for vertex in (start, end):
+            if vertex not in self.__vertex_2_index:
+                raise ValueError(f"Vertex '{vertex.name}' is not in the contraction hierarchy")
+
+    # Bidirectional upward Dijkstra: returns the shortest distance, the vertex where the two searches meet on a shortest
+    # path (-1 if end is unreachable) and the parent dictionaries of the forward and backward searches.
+    def _search(self, start: int, end: int) -> Tuple[float, int, Dict[int, int], Dict[int, int]]:
+        infinity: float = float("inf")
+        forward_distance: Dict[int, float] = {start: 0.0}
+        backward_distance: Dict[int, float] = {end: 0.0}
+        forward_parent: Dict[int, int] = {start: -1}
+        backward_parent: Dict[int, int] = {end: -1}
+        # Each search follows its upward edges and uses the opposite ones for stall-on-demand
+        searches: List[
+            Tuple[List[Tuple[float, int]], Dict[int, float], Dict[int, int], List[List[Tuple[int, float]]], List[List[Tuple[int, float]]], Dict[int, float]]
+        ] = [
+            ([(0.0, start)], forward_distance, forward_parent, self.__upward_out_edges, self.__upward_in_edges, backward_distance),
+            ([(0.0, end)], backward_distance, backward_parent, self.__upward_in_edges, self.__upward_out_edges, forward_distance),
+        ]
+        best_distance: float = infinity
+        meeting_vertex: int = -1
+        is_active: bool = True
+        while is_active:
+            is_active = False
+            for queue, distance, parent, edges, stall_edges, other_distance in searches:
+                # A search can stop as soon as it can't improve the best distance found so far
+                if not queue or queue[0][0] >= best_distance:
+                    continue
+                is_active = True
+                current_distance, current = heappop(queue)
+                if current_distance > distance[current]:
+                    continue
+                if current in other_distance and current_distance + other_distance[current] < best_distance:
+                    best_distance = current_distance + other_distance[current]
+                    meeting_vertex = current
+                # Stall-on-demand: if a more important vertex reaches the current one with a shorter distance, the current
+                # distance isn't a shortest path distance and the search doesn't continue from here.
+                if any(distance.get(neighbor, infinity) + weight < current_distance for neighbor, weight in stall_edges[current]):
+                    continue
+                for neighbor, weight in edges[current]:
+                    new_distance: float = current_distance + weight
+                    if new_distance < distance.get(neighbor, infinity):
+                        distance[neighbor] = new_distance
+                        parent[neighbor] = current
+                        heappush(queue, (new_distance, neighbor))
+        return best_distance, meeting_vertex, forward_parent, backward_parent
+
+    # Appends the original vertexes of the edge (source, target) to path, excluding source
+    def _unpack_edge(self, source: int, target: int, path: List[int]) -> None:
+        stack: List[Tuple[int, int]] = [(source, target)]
+        while stack:
+            source, target = stack.pop()
+            middle: Optional[int] = self.__shortcut_2_middle.get((source, target))
+            if middle is None:
+                path.append(target)
+            else:
+                stack.append((middle, target))
+                stack.append((source, middle))
+
+    def shortest_distance(self, start: Vertex[ValueType], end: Vertex[ValueType]) -> Optional[float]:
+        self._check_query(start, end)
+        distance, meeting_vertex, _, _ = self._search(self.__vertex_2_index[start], self.__vertex_2_index[end])
+        return distance if meeting_vertex != -1 else None
+
+    # Same result format as Graph.dijkstra(): the path goes from end to start, unless reverse is False.
+    def shortest_path(self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True) -> Optional[Iterator[Vertex[ValueType]]]:
+        self._check_query(start, end)
+        _, meeting_vertex, forward_parent, backward_parent = self._search(self.__vertex_2_index[start], self.__vertex_2_index[end])
+        if meeting_vertex == -1:
+            return None
+        # Upward path in the hierarchy: start -> meeting vertex (forward search), then meeting vertex -> end (backward search)
+        hierarchy_path: List[int] = []
+        current: int = meeting_vertex
+        while current != -1:
+            hierarchy_path.append(current)
+            current = forward_parent[current]
+        hierarchy_path.reverse()
+        current = backward_parent[meeting_vertex]
+        while current != -1:
+            hierarchy_path.append(current)
+            current = backward_parent[current]
+
+        path: List[int] = [hierarchy_path[0]]
+        for source, target in zip(hierarchy_path, hierarchy_path[1:]):
+            self._unpack_edge(source, target, path)
+        if reverse:
+            path.reverse()
+        return iter([self.__vertexes[index] for index in path])
@@ -13,19 +13,49 @@
 # limitations under the License.
 
 
+import asyncio
+import mmap
+import sys
+import weakref
+from array import array
 from collections import deque
 from dataclasses import dataclass
+from functools import partial
+from io import StringIO
+from itertools import islice
 from queue import PriorityQueue
-from typing import Deque, Dict, Generic, Iterator, List, Optional, Set
+from time import perf_counter
+from typing import Callable, Deque, Dict, Generator, Generic, Iterator, List, Optional, Sequence, Set, TextIO, Tuple, TypeVar
 
-from prezzemolo.utility import ValueType
-from prezzemolo.vertex import Vertex
+from prezzemolo.instrumentation import Instrumentation, InstrumentationSample
+from prezzemolo.reachability_index import ReachabilityIndex
+from prezzemolo.utility import TRUNCATION_MARKER, ValueType, to_string
+from prezzemolo.vertex import DEFAULT_REPR_MAX_NEIGHBORS, Vertex
+
+# Binary graph file layout (little-endian): header (magic, uint32 version, uint64 vertex count V, uint64 edge count E),
+# vertex name offsets (V+1 uint64), UTF-8 vertex names, padding to 8 bytes, CSR edge offsets (V+1 uint64), edge weights
+# (E float64), edge targets (E uint32, as vertex indexes).
+_FILE_MAGIC: bytes = b"PRZG"
+_FILE_VERSION: int = 1
+_FILE_HEADER_SIZE: int = 24
+
+_TableItemType = TypeVar("_TableItemType", int, float)  # pylint: disable=invalid-name
+# Vertexes, edge offsets, edge weights and edge targets of a loaded graph
+_CsrTables = Tuple[List[Vertex[ValueType]], "array[int]", "array[float]", "array[int]"]
+
+# Default bound of to_string(), __str__() and __repr__(): larger graphs are summarized (see render())
+DEFAULT_REPR_MAX_VERTEXES: int = 100
+
+# Number of vertexes processed by the asyncio search variants between two consecutive yields to the event loop
+DEFAULT_YIELD_EVERY: int = 1000
 
 
 @dataclass(frozen=True)
 class _ShortestDistance(Generic[ValueType]):
     distance: float
     vertex: Vertex[ValueType]
+    # Number of edges from the start vertex (only tracked by hop-limited searches)
+    hops: int = 0
 
     # __lt__ and __gt__ are needed for PriorityQueue
     def __lt__(self, other: object) -> bool:
@@ -40,11 +70,69 @@ class _ShortestDistance(Generic[ValueType]):
 
 
 class Graph(Generic[ValueType]):
-    def __init__(self, vertexes: Optional[List["Vertex[ValueType]"]] = None) -> None:
+    def __init__(self, vertexes: Optional[List["Vertex[ValueType]"]] = None, instrumentation: Optional[Instrumentation] = None) -> None:
+        self.__instrumentation: Optional[Instrumentation] = instrumentation
         self.__vertexes: Dict[Vertex[ValueType], Vertex[ValueType]] = {vertex: vertex for vertex in vertexes} if vertexes else {}
         self.__non_validated_vertexes: Set[Vertex[ValueType]] = set(vertexes) if vertexes else set()
+        # Built lazily by are_connected() and kept up to date incrementally as vertexes and edges are added
+        self.__reachability_index: Optional[ReachabilityIndex[ValueType]] = None
+        # Cached by topological_order() and dropped when vertexes or edges are added
+        self.__topological_order: Optional[List[Vertex[ValueType]]] = None
+        # Johnson reweighting: when enabled, dijkstra() uses vertex potentials (computed lazily and dropped when vertexes or
+        # edges are added) to turn negative edge weights into non-negative ones.
+        self.__johnson_reweighting: bool = False
+        self.__potentials: Optional[Dict[Vertex[ValueType], float]] = None
         for vertex in self.vertexes:
             self._validate_vertex(vertex)
+            vertex.add_neighbor_observer(self._on_neighbor_added)
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        vertexes: StringIO = StringIO()
+        self._render_vertexes(vertexes, DEFAULT_REPR_MAX_VERTEXES, DEFAULT_REPR_MAX_NEIGHBORS)
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(vertexes={vertexes.getvalue()}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"vertexes={vertexes.getvalue()}")
+        if len(self.__vertexes) > DEFAULT_REPR_MAX_VERTEXES:
+            class_specific_data.append(f"vertex_count={stringify(len(self.__vertexes))}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    # Streams the graph to output one vertex at a time, in the same format as to_string(): at most max_vertexes vertexes
+    # are written, each with at most max_neighbors neighbors (see Vertex.render()), and vertex_count is written whenever
+    # vertexes are left out.
+    def render(self, output: TextIO, repr_format: bool = True, *, max_vertexes: Optional[int] = None, max_neighbors: Optional[int] = None) -> None:
+        if max_vertexes is not None and (not isinstance(max_vertexes, int) or max_vertexes < 1):
+            raise ValueError(f"max_vertexes must be a positive integer: {repr(max_vertexes)}")
+        output.write(f"{type(self).__name__}(vertexes=" if repr_format else f"{type(self).__name__}:\n  vertexes=")
+        self._render_vertexes(output, max_vertexes, max_neighbors)
+        if max_vertexes is not None and len(self.__vertexes) > max_vertexes:
+            output.write(f", vertex_count={len(self.__vertexes)}" if repr_format else f"\n  vertex_count={len(self.__vertexes)}")
+        if repr_format:
+            output.write(")")
+
+    # Vertexes are always written in repr format, like the elements of a list
+    def _render_vertexes(self, output: TextIO, max_vertexes: Optional[int], max_neighbors: Optional[int]) -> None:
+        output.write("[")
+        for index, vertex in enumerate(islice(self.__vertexes, max_vertexes)):
+            if index > 0:
+                output.write(", ")
+            vertex.render(output, max_neighbors=max_neighbors)
+        if max_vertexes is not None and len(self.__vertexes) > max_vertexes:
+            output.write(f", {TRUNCATION_MARKER}")
+        output.write("]")
 
     def _validate_vertex(self, vertex: Vertex[ValueType]) -> bool:
         if vertex not in self.__non_validated_vertexes:
@@ -55,14 +143,129 @@ class Graph(Generic[ValueType]):
         self.__non_validated_vertexes.remove(vertex)
         return True
 
+    def __contains__(self, vertex: Vertex[ValueType]) -> bool:
+        return vertex in self.__vertexes
+
     @property
     def vertexes(self) -> Iterator[Vertex[ValueType]]:
         return iter(self.__vertexes.keys())
 
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        return self.__instrumentation
+
     def add_vertex(self, vertex: Vertex[ValueType]) -> None:
+        if vertex not in self.__vertexes:
+            vertex.add_neighbor_observer(self._on_neighbor_added)
         self.__vertexes[vertex] = vertex
         self.__non_validated_vertexes.add(vertex)
         self._validate_vertex(vertex)
+        self.__topological_order = None
+        self.__potentials = None
+        if self.__reachability_index is not None and not self.__reachability_index.add_vertex(vertex):
+            self.__reachability_index = None
+
+    def _on_neighbor_added(self, vertex: Vertex[ValueType], neighbor: Vertex[ValueType]) -> None:
+        self.__topological_order = None
+        self.__potentials = None
+        if self.__reachability_index is not None and not self.__reachability_index.add_edge(vertex, neighbor):
+            self.__reachability_index = None
+
+    def _check_validated(self) -> None:
+        if self.__non_validated_vertexes:
+            raise ValueError(f"Some vertexes have neighbors that weren't added to the graph: {[v.name for v in self.__non_validated_vertexes]}")
+
+    # Saves vertex names and weighted edges to a compact binary file in CSR (compressed sparse row) format. Vertex data is not saved.
+    def save(self, path: str) -> None:
+        self._check_validated()
+        vertex_2_index: Dict[Vertex[ValueType], int] = {vertex: index for index, vertex in enumerate(self.__vertexes)}
+        if len(vertex_2_index) > 0xFFFFFFFF:
+            raise ValueError(f"Too many vertexes to save: {len(vertex_2_index)}")
+        name_offsets: "array[int]" = array("Q", [0])
+        names: List[bytes] = []
+        edge_offsets: "array[int]" = array("Q", [0])
+        edge_weights: "array[float]" = array("d")
+        edge_targets: "array[int]" = array("I")
+        for vertex in self.__vertexes:
+            name: bytes = vertex.name.encode("utf-8")
+            names.append(name)
+            name_offsets.append(name_offsets[-1] + len(name))
+            for neighbor in vertex.neighbors:
+                edge_weights.append(vertex.get_weight(neighbor))
+                edge_targets.append(vertex_2_index[neighbor])
+            edge_offsets.append(len(edge_targets))
+        name_table: bytes = b"".join(names)
+        if sys.byteorder != "little":
+            name_offsets.byteswap()
+            edge_offsets.byteswap()
+            edge_weights.byteswap()
+            edge_targets.byteswap()
+        with open(path, "wb") as file:
+            file.write(_FILE_MAGIC)
+            file.write(_FILE_VERSION.to_bytes(4, "little"))
+            file.write(len(vertex_2_index).to_bytes(8, "little"))
+            file.write(len(edge_targets).to_bytes(8, "little"))
+            name_offsets.tofile(file)
+            file.write(name_table)
+            file.write(b"\0" * (-len(name_table) % 8))
+            edge_offsets.tofile(file)
+            edge_weights.tofile(file)
+            edge_targets.tofile(file)
+
+    # Loads a graph written by save(): the file is memory-mapped and its arrays are copied in bulk straight from the mapping.
+    # Only the vertexes are created upfront: CSR data is valid by construction, so it isn't validated, and the neighbors of
+    # each vertex are created from the arrays (and observed by the graph) the first time they are accessed. Loaded vertexes
+    # have no data.
+    @classmethod
+    def load(cls, path: str) -> "Graph[ValueType]":
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file, memoryview(mapped_file) as view:
+            if len(view) < _FILE_HEADER_SIZE or view[0:4] != _FILE_MAGIC or int.from_bytes(view[4:8], "little") != _FILE_VERSION:
+                raise ValueError(f"Not a graph file (or unsupported version): {path}")
+            vertex_count: int = int.from_bytes(view[8:16], "little")
+            edge_count: int = int.from_bytes(view[16:24], "little")
+            name_offsets: "array[int]" = cls._read_table(view, _FILE_HEADER_SIZE, array("Q"), vertex_count + 1)
+            offset: int = _FILE_HEADER_SIZE + 8 * (vertex_count + 1)
+            name_table: bytes = bytes(view[offset : offset + name_offsets[-1]])
+            offset += name_offsets[-1] + (-name_offsets[-1] % 8)
+            edge_offsets: "array[int]" = cls._read_table(view, offset, array("Q"), vertex_count + 1)
+            offset += 8 * (vertex_count + 1)
+            edge_weights: "array[float]" = cls._read_table(view, offset, array("d"), edge_count)
+            offset += 8 * edge_count
+            edge_targets: "array[int]" = cls._read_table(view, offset, array("I"), edge_count)
+
+        vertexes: List[Vertex[ValueType]] = [
+            Vertex[ValueType](name=name_table[name_offsets[index] : name_offsets[index + 1]].decode("utf-8")) for index in range(vertex_count)
+        ]
+        result: Graph[ValueType] = cls()
+        result.__vertexes = {vertex: vertex for vertex in vertexes}
+        csr: _CsrTables[ValueType] = (vertexes, edge_offsets, edge_weights, edge_targets)
+        observer_reference: "weakref.WeakMethod[Callable[[Vertex[ValueType], Vertex[ValueType]], None]]" = weakref.WeakMethod(result._on_neighbor_added)
+        for index, vertex in enumerate(vertexes):
+            vertex._set_neighbor_loader(partial(cls._load_neighbors, csr, observer_reference, index))  # pylint: disable=protected-access
+        return result
+
+    @staticmethod
+    def _read_table(view: memoryview, offset: int, table: "array[_TableItemType]", count: int) -> "array[_TableItemType]":
+        if offset + table.itemsize * count > len(view):
+            raise ValueError("Truncated graph file")
+        table.frombytes(view[offset : offset + table.itemsize * count])
+        if sys.byteorder != "little":
+            table.byteswap()
+        return table
+
+    # Neighbor loader of the vertex at index in the CSR tables of a loaded graph: the graph (if still alive) starts observing
+    # the vertex when its neighbors are materialized, since they can't change before then.
+    @staticmethod
+    def _load_neighbors(
+        csr: "_CsrTables[ValueType]", observer_reference: "weakref.WeakMethod[Callable[[Vertex[ValueType], Vertex[ValueType]], None]]", index: int
+    ) -> Tuple[List[Vertex[ValueType]], Sequence[float]]:
+        vertexes, edge_offsets, edge_weights, edge_targets = csr
+        observer: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], None]] = observer_reference()
+        if observer is not None:
+            vertexes[index].add_neighbor_observer(observer)
+        first_edge: int = edge_offsets[index]
+        last_edge: int = edge_offsets[index + 1]
+        return [vertexes[target] for target in edge_targets[first_edge:last_edge]], edge_weights[first_edge:last_edge]
 
     def _extract_path_from_parent_dictionary(
         self, last: Vertex[ValueType], vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]
@@ -79,45 +282,138 @@ class Graph(Generic[ValueType]):
         start: Vertex[ValueType],
         end: Optional[Vertex[ValueType]],
         vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]] = None,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
     ) -> bool:
-        if self.__non_validated_vertexes:
-            raise ValueError(f"Some vertexes have neighbors that weren't added to the graph: {[v.name for v in self.__non_validated_vertexes]}")
+        return self._run_to_completion(
+            self._breadth_first_search_steps(start, end, vertex_2_parent, 0, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter)
+        )
+
+    # Generator-based search: it yields control every yield_every visited vertexes (never, if yield_every is 0) and returns
+    # the search result via StopIteration. This lets the same code serve both the synchronous and the asyncio APIs.
+    # Searches can be restricted lazily: vertexes and edges rejected by vertex_filter / edge_filter are skipped when they
+    # are reached, and vertexes max_hops edges away from start are not expanded.
+    def _breadth_first_search_steps(
+        self,
+        start: Vertex[ValueType],
+        end: Optional[Vertex[ValueType]],
+        vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]],
+        yield_every: int,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Generator[None, None, bool]:
+        self._check_validated()
+        self._validate_max_hops(max_hops)
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
         queue: Deque[Vertex[ValueType]] = deque()
-        queue.append(start)
         visited: Set[Vertex[ValueType]] = set()
-        visited.add(start)
+        # Only tracked by hop-limited searches
+        vertex_2_hops: Dict[Vertex[ValueType], int] = {start: 0}
+        if vertex_filter is None or vertex_filter(start):
+            queue.append(start)
+            visited.add(start)
         if vertex_2_parent is not None:
             vertex_2_parent[start] = None
+        unfiltered: bool = vertex_filter is None and edge_filter is None
+        visited_count: int = 0
+        found: bool = False
 
         while len(queue) > 0:
             current_vertex: Vertex[ValueType] = queue.popleft()
             if current_vertex == end:
-                return True
-            for neighbor in current_vertex.neighbors:
+                found = True
+                break
+            visited_count += 1
+            if visited_count == yield_every:
+                visited_count = 0
+                yield
+            neighbor_hops: int = 0
+            if max_hops is not None:
+                neighbor_hops = vertex_2_hops[current_vertex] + 1
+                if neighbor_hops > max_hops:
+                    continue
+            for neighbor in current_vertex.neighbors if unfiltered else self._get_neighbors(current_vertex, vertex_filter, edge_filter):
                 if not neighbor in visited:
                     queue.append(neighbor)
                     visited.add(neighbor)
+                    if max_hops is not None:
+                        vertex_2_hops[neighbor] = neighbor_hops
                     if vertex_2_parent is not None:
                         vertex_2_parent[neighbor] = current_vertex
 
-        return False
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="breadth_first_search",
+                    duration=perf_counter() - start_time,
+                    counters={"vertexes_discovered": len(visited)},
+                )
+            )
+        return found
 
     def are_connected(self, start: Vertex[ValueType], end: Vertex[ValueType]) -> bool:
-        # start and end are type checked inside _breadth_first_search()
-        return self._breadth_first_search(start, end, vertex_2_parent=None)
+        self._check_validated()
+        if self.__reachability_index is None:
+            self.__reachability_index = ReachabilityIndex(self.vertexes)
+        if start not in self.__reachability_index:
+            # start is not in the graph: fall back to a plain search (start and end are type checked inside _breadth_first_search())
+            return self._breadth_first_search(start, end, vertex_2_parent=None)
+        return self.__reachability_index.are_connected(start, end)
 
     def _dijkstra(
-        self, start: Vertex[ValueType], end: Optional[Vertex[ValueType]], vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]] = None
+        self,
+        start: Vertex[ValueType],
+        end: Optional[Vertex[ValueType]],
+        vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]] = None,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
     ) -> bool:
-        if self.__non_validated_vertexes:
-            raise ValueError(f"Some vertexes have neighbors that weren't added to the graph: {[v.name for v in self.__non_validated_vertexes]}")
-        distance: Dict[Vertex[ValueType], float] = {v: float("inf") for v in self.__vertexes}
-        distance[start] = 0.0
+        return self._run_to_completion(
+            self._dijkstra_steps(start, end, vertex_2_parent, 0, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter)
+        )
+
+    # Generator-based search: see _breadth_first_search_steps().
+    def _dijkstra_steps(  # pylint: disable=too-many-branches
+        self,
+        start: Vertex[ValueType],
+        end: Optional[Vertex[ValueType]],
+        vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]],
+        yield_every: int,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Generator[None, None, bool]:
+        self._check_validated()
+        self._validate_max_hops(max_hops)
+        if max_hops is not None:
+            return (
+                yield from self._hop_limited_dijkstra_steps(
+                    start, end, vertex_2_parent, yield_every, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter
+                )
+            )
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        potentials: Optional[Dict[Vertex[ValueType], float]] = self._get_potentials() if self.__johnson_reweighting else None
+        # Distances of vertexes that haven't been reached yet are implicitly infinite, so only the explored part of the graph is touched
+        distance: Dict[Vertex[ValueType], float] = {start: 0.0}
+        infinity: float = float("inf")
         remaining_vertexes: PriorityQueue[_ShortestDistance[ValueType]] = PriorityQueue()
-        remaining_vertexes.put(_ShortestDistance(distance=0.0, vertex=start))
+        if vertex_filter is None or vertex_filter(start):
+            remaining_vertexes.put(_ShortestDistance(distance=0.0, vertex=start))
         visited: Set[Vertex[ValueType]] = set()
+        unfiltered: bool = vertex_filter is None and edge_filter is None
         if vertex_2_parent is not None:
             vertex_2_parent[start] = None
+        settled_count: int = 0
+        relaxation_count: int = 0
+        heap_size_high_water_mark: int = 1
+        found: bool = False
 
         while not remaining_vertexes.empty():
             shortest_distance: _ShortestDistance[ValueType] = remaining_vertexes.get()
@@ -127,36 +423,410 @@ class Graph(Generic[ValueType]):
             if current_vertex in visited:
                 continue
             if current_vertex == end:
-                return True
+                found = True
+                break
 
             visited.add(current_vertex)
+            settled_count += 1
+            if settled_count == yield_every:
+                settled_count = 0
+                yield
 
-            for neighbor in current_vertex.neighbors:
-                neighbor_distance = current_distance + current_vertex.get_weight(neighbor)
-                if neighbor_distance < distance[neighbor]:
+            for neighbor in current_vertex.neighbors if unfiltered else self._get_neighbors(current_vertex, vertex_filter, edge_filter):
+                weight: float = current_vertex.get_weight(neighbor)
+                if potentials is None:
+                    if weight < 0:
+                        raise ValueError(
+                            f"Negative weight edge '{current_vertex.name}'->'{neighbor.name}': use bellman_ford() or use_johnson_reweighting() instead"
+                        )
+                else:
+                    weight += potentials[current_vertex] - potentials[neighbor]
+                neighbor_distance = current_distance + weight
+                if neighbor_distance < distance.get(neighbor, infinity):
                     distance[neighbor] = neighbor_distance
                     remaining_vertexes.put(_ShortestDistance(distance=neighbor_distance, vertex=neighbor))
+                    relaxation_count += 1
+                    if self.__instrumentation is not None:
+                        heap_size_high_water_mark = max(heap_size_high_water_mark, remaining_vertexes.qsize())
                     if vertex_2_parent is not None:
                         vertex_2_parent[neighbor] = current_vertex
 
-        return False
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="dijkstra",
+                    duration=perf_counter() - start_time,
+                    counters={"vertexes_settled": len(visited), "edges_relaxed": relaxation_count},
+                    high_water_marks={"heap_size": heap_size_high_water_mark},
+                )
+            )
+        return found
+
+    # Dijkstra restricted to paths of at most max_hops edges. The shortest path to a vertex may have too many hops while a
+    # longer one doesn't, so the search settles labels (vertex, hops) instead of vertexes: a label is dominated, and skipped,
+    # if the same vertex was already settled with fewer hops (and, since labels are settled in distance order, no longer
+    # distance). Each vertex is settled at most max_hops + 1 times.
+    def _hop_limited_dijkstra_steps(  # pylint: disable=too-many-branches
+        self,
+        start: Vertex[ValueType],
+        end: Optional[Vertex[ValueType]],
+        vertex_2_parent: Optional[Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]],
+        yield_every: int,
+        *,
+        max_hops: int,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]],
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]],
+    ) -> Generator[None, None, bool]:
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        potentials: Optional[Dict[Vertex[ValueType], float]] = self._get_potentials() if self.__johnson_reweighting else None
+        label_2_distance: Dict[Tuple[Vertex[ValueType], int], float] = {(start, 0): 0.0}
+        label_2_parent: Dict[Tuple[Vertex[ValueType], int], Optional[Vertex[ValueType]]] = {(start, 0): None}
+        vertex_2_settled_hops: Dict[Vertex[ValueType], int] = {}
+        remaining_labels: PriorityQueue[_ShortestDistance[ValueType]] = PriorityQueue()
+        if vertex_filter is None or vertex_filter(start):
+            remaining_labels.put(_ShortestDistance(distance=0.0, vertex=start, hops=0))
+        settled_count: int = 0
+        steps_since_yield: int = 0
+        relaxation_count: int = 0
+        found_hops: Optional[int] = None
+
+        while not remaining_labels.empty():
+            label: _ShortestDistance[ValueType] = remaining_labels.get()
+            current_vertex: Vertex[ValueType] = label.vertex
+            if vertex_2_settled_hops.get(current_vertex, max_hops + 1) <= label.hops:
+                continue
+            if current_vertex == end:
+                found_hops = label.hops
+                break
+            vertex_2_settled_hops[current_vertex] = label.hops
+            settled_count += 1
+            steps_since_yield += 1
+            if steps_since_yield == yield_every:
+                steps_since_yield = 0
+                yield
+            if label.hops == max_hops:
+                continue
+
+            neighbor_hops: int = label.hops + 1
+            for neighbor in self._get_neighbors(current_vertex, vertex_filter, edge_filter):
+                if vertex_2_settled_hops.get(neighbor, max_hops + 1) <= neighbor_hops:
+                    continue
+                neighbor_distance: float = label.distance + self._get_reduced_weight(current_vertex, neighbor, potentials)
+                neighbor_label: Tuple[Vertex[ValueType], int] = (neighbor, neighbor_hops)
+                if neighbor_label not in label_2_distance or neighbor_distance < label_2_distance[neighbor_label]:
+                    label_2_distance[neighbor_label] = neighbor_distance
+                    label_2_parent[neighbor_label] = current_vertex
+                    remaining_labels.put(_ShortestDistance(distance=neighbor_distance, vertex=neighbor, hops=neighbor_hops))
+                    relaxation_count += 1
+
+        if found_hops is not None and end is not None and vertex_2_parent is not None:
+            # Labels on a shortest path have decreasing hops, so the path visits each vertex once and fits a parent dictionary
+            vertex: Vertex[ValueType] = end
+            vertex_2_parent[start] = None
+            for hops in range(found_hops, 0, -1):
+                parent: Optional[Vertex[ValueType]] = label_2_parent[(vertex, hops)]
+                vertex_2_parent[vertex] = parent
+                if parent is None:
+                    break
+                vertex = parent
+
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="dijkstra",
+                    duration=perf_counter() - start_time,
+                    counters={"vertexes_settled": settled_count, "edges_relaxed": relaxation_count},
+                )
+            )
+        return found_hops is not None
+
+    @staticmethod
+    def _get_neighbors(
+        vertex: Vertex[ValueType],
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]],
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]],
+    ) -> Iterator[Vertex[ValueType]]:
+        return (
+            neighbor
+            for neighbor in vertex.neighbors
+            if (vertex_filter is None or vertex_filter(neighbor)) and (edge_filter is None or edge_filter(vertex, neighbor))
+        )
+
+    # Edge weight as seen by the hop-limited dijkstra(): reweighted with Johnson potentials, if available, and otherwise required to be non-negative
+    @staticmethod
+    def _get_reduced_weight(vertex: Vertex[ValueType], neighbor: Vertex[ValueType], potentials: Optional[Dict[Vertex[ValueType], float]]) -> float:
+        weight: float = vertex.get_weight(neighbor)
+        if potentials is not None:
+            return weight + potentials[vertex] - potentials[neighbor]
+        if weight < 0:
+            raise ValueError(f"Negative weight edge '{vertex.name}'->'{neighbor.name}': use bellman_ford() or use_johnson_reweighting() instead")
+        return weight
+
+    # Shortest Path Faster Algorithm: queue-based Bellman-Ford that only relaxes the edges of vertexes whose distance changed,
+    # so it terminates as soon as distances converge. Any cycle in the parent graph has negative weight and, if a negative cycle
+    # is reachable from the sources, the parent graph eventually contains one: it is checked every len(graph) relaxations.
+    # Returns the negative cycle, if one is found.
+    def _shortest_path_faster(
+        self,
+        sources: List[Vertex[ValueType]],
+        distance: Dict[Vertex[ValueType], float],
+        vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]],
+    ) -> Optional[List[Vertex[ValueType]]]:
+        self._check_validated()
+        queue: Deque[Vertex[ValueType]] = deque(sources)
+        queued: Set[Vertex[ValueType]] = set(sources)
+        for source in sources:
+            distance[source] = 0.0
+            vertex_2_parent[source] = None
+        start_time: float = perf_counter() if self.__instrumentation is not None else 0.0
+        check_interval: int = max(len(self.__vertexes), 1)
+        relaxation_count: int = 0
+        total_relaxation_count: int = 0
+        cycle: Optional[List[Vertex[ValueType]]] = None
+
+        while queue:
+            current_vertex: Vertex[ValueType] = queue.popleft()
+            queued.remove(current_vertex)
+            current_distance: float = distance[current_vertex]
+            for neighbor in current_vertex.neighbors:
+                neighbor_distance: float = current_distance + current_vertex.get_weight(neighbor)
+                if neighbor not in distance or neighbor_distance < distance[neighbor]:
+                    distance[neighbor] = neighbor_distance
+                    vertex_2_parent[neighbor] = current_vertex
+                    if neighbor not in queued:
+                        queue.append(neighbor)
+                        queued.add(neighbor)
+                    relaxation_count += 1
+                    if relaxation_count == check_interval:
+                        total_relaxation_count += relaxation_count
+                        relaxation_count = 0
+                        cycle = self._find_parent_cycle(vertex_2_parent)
+                        if cycle is not None:
+                            queue.clear()
+                            break
+
+        if self.__instrumentation is not None:
+            self.__instrumentation.record(
+                InstrumentationSample(
+                    operation="shortest_path_faster",
+                    duration=perf_counter() - start_time,
+                    counters={"vertexes_reached": len(distance), "edges_relaxed": total_relaxation_count + relaxation_count},
+                )
+            )
+        return cycle
+
+    @staticmethod
+    def _find_parent_cycle(vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]]) -> Optional[List[Vertex[ValueType]]]:
+        vertex_2_walk: Dict[Vertex[ValueType], int] = {}
+        for walk, vertex in enumerate(vertex_2_parent):
+            current_vertex: Optional[Vertex[ValueType]] = vertex
+            while current_vertex is not None and current_vertex not in vertex_2_walk:
+                vertex_2_walk[current_vertex] = walk
+                current_vertex = vertex_2_parent[current_vertex]
+            if current_vertex is not None and vertex_2_walk[current_vertex] == walk:
+                # The walk looped back on itself: collect the cycle in edge direction
+                result: List[Vertex[ValueType]] = [current_vertex]
+                cycle_vertex: Optional[Vertex[ValueType]] = vertex_2_parent[current_vertex]
+                while cycle_vertex is not None and cycle_vertex != current_vertex:
+                    result.append(cycle_vertex)
+                    cycle_vertex = vertex_2_parent[cycle_vertex]
+                result.reverse()
+                return result
+        return None
 
-    def breadth_first_search(self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True) -> Optional[Iterator[Vertex[ValueType]]]:
+    # Potentials for Johnson reweighting: shortest distances from a virtual source connected to every vertex with a zero weight edge.
+    def _get_potentials(self) -> Dict[Vertex[ValueType], float]:
+        if self.__potentials is None:
+            potentials: Dict[Vertex[ValueType], float] = {}
+            cycle: Optional[List[Vertex[ValueType]]] = self._shortest_path_faster(list(self.__vertexes), potentials, {})
+            if cycle is not None:
+                raise ValueError(f"Graph contains a negative cycle: {[v.name for v in cycle]}")
+            self.__potentials = potentials
+        return self.__potentials
+
+    @staticmethod
+    def _run_to_completion(search: Generator[None, None, bool]) -> bool:
+        while True:
+            try:
+                next(search)
+            except StopIteration as exc:
+                result: bool = exc.value
+                return result
+
+    # Cancelling the awaiting task raises CancelledError at the next yield point and closes the search generator. The graph
+    # must not be modified while a cooperative search is in progress.
+    @staticmethod
+    async def _run_cooperatively(search: Generator[None, None, bool]) -> bool:
+        try:
+            while True:
+                try:
+                    next(search)
+                except StopIteration as exc:
+                    result: bool = exc.value
+                    return result
+                await asyncio.sleep(0)
+        finally:
+            search.close()
+
+    def _get_path(
+        self, end: Vertex[ValueType], vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]], reverse: bool
+    ) -> Iterator[Vertex[ValueType]]:
+        result = self._extract_path_from_parent_dictionary(end, vertex_2_parent)
+        if not reverse:
+            return reversed(result)
+        return iter(result)
+
+    # Searches accept optional restrictions: max_hops bounds the number of edges of the path, vertex_filter and edge_filter
+    # are predicates evaluated lazily on the vertexes and edges reached by the search (see also GraphView).
+    def breadth_first_search(
+        self,
+        start: Vertex[ValueType],
+        end: Vertex[ValueType],
+        reverse: bool = True,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
         # start and end are type checked inside _breadth_first_search()
         vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {}
-        if self._breadth_first_search(start, end, vertex_2_parent):
-            result = self._extract_path_from_parent_dictionary(end, vertex_2_parent)
-            if not reverse:
-                return reversed(result)
-            return iter(result)
+        if self._breadth_first_search(start, end, vertex_2_parent, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter):
+            return self._get_path(end, vertex_2_parent, reverse)
         return None
 
-    def dijkstra(self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True) -> Optional[Iterator[Vertex[ValueType]]]:
+    def dijkstra(
+        self,
+        start: Vertex[ValueType],
+        end: Vertex[ValueType],
+        reverse: bool = True,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
         # start and end are type checked inside _dijkstra()
         vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {}
-        if self._dijkstra(start, end, vertex_2_parent):
-            result = self._extract_path_from_parent_dictionary(end, vertex_2_parent)
-            if not reverse:
-                return reversed(result)
-            return iter(result)
+        if self._dijkstra(start, end, vertex_2_parent, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter):
+            return self._get_path(end, vertex_2_parent, reverse)
+        return None
+
+    # Shortest path supporting negative weights (see _shortest_path_faster()). Raises ValueError if a negative cycle is reachable from start.
+    def bellman_ford(self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True) -> Optional[Iterator[Vertex[ValueType]]]:
+        distance: Dict[Vertex[ValueType], float] = {}
+        vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {}
+        cycle: Optional[List[Vertex[ValueType]]] = self._shortest_path_faster([start], distance, vertex_2_parent)
+        if cycle is not None:
+            raise ValueError(f"Graph contains a negative cycle: {[v.name for v in cycle]}")
+        if end not in distance:
+            return None
+        return self._get_path(end, vertex_2_parent, reverse)
+
+    # Returns the vertexes of a negative cycle in edge order (the last vertex is connected to the first one), if there is one.
+    def find_negative_cycle(self) -> Optional[Iterator[Vertex[ValueType]]]:
+        cycle: Optional[List[Vertex[ValueType]]] = self._shortest_path_faster(list(self.__vertexes), {}, {})
+        return iter(cycle) if cycle is not None else None
+
+    # When enabled, dijkstra() reweights edges using Johnson's vertex potentials, so that it returns correct shortest paths
+    # on graphs with negative weights (but no negative cycles). Potentials cost one Bellman-Ford pass and are reused by all
+    # subsequent queries until the graph changes.
+    def use_johnson_reweighting(self, enabled: bool = True) -> None:
+        if not isinstance(enabled, bool):
+            raise TypeError(f"enabled is not a bool: {repr(enabled)}")
+        self.__johnson_reweighting = enabled
+
+    # Kahn's algorithm: raises ValueError if the graph has a cycle.
+    def topological_order(self) -> Iterator[Vertex[ValueType]]:
+        self._check_validated()
+        if self.__topological_order is None:
+            vertex_2_in_degree: Dict[Vertex[ValueType], int] = {vertex: 0 for vertex in self.__vertexes}
+            for vertex in self.__vertexes:
+                for neighbor in vertex.neighbors:
+                    vertex_2_in_degree[neighbor] += 1
+            result: List[Vertex[ValueType]] = [vertex for vertex, in_degree in vertex_2_in_degree.items() if in_degree == 0]
+            # result doubles as the queue of vertexes with no incoming edges left: index points to its head
+            index: int = 0
+            while index < len(result):
+                for neighbor in result[index].neighbors:
+                    vertex_2_in_degree[neighbor] -= 1
+                    if vertex_2_in_degree[neighbor] == 0:
+                        result.append(neighbor)
+                index += 1
+            if len(result) < len(vertex_2_in_degree):
+                raise ValueError(f"Graph contains a cycle involving vertexes: {[v.name for v, in_degree in vertex_2_in_degree.items() if in_degree > 0]}")
+            self.__topological_order = result
+        return iter(self.__topological_order)
+
+    # Shortest path on a directed acyclic graph: edges are relaxed in topological order, which takes O(V+E) and, unlike
+    # dijkstra(), supports negative weights. Raises ValueError if the graph has a cycle.
+    def dag_shortest_path(self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True) -> Optional[Iterator[Vertex[ValueType]]]:
+        vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {start: None}
+        distance: Dict[Vertex[ValueType], float] = {start: 0.0}
+        started: bool = False
+        for vertex in self.topological_order():
+            if vertex == start:
+                started = True
+            if not started or vertex not in distance:
+                continue
+            if vertex == end:
+                return self._get_path(end, vertex_2_parent, reverse)
+            vertex_distance: float = distance[vertex]
+            for neighbor in vertex.neighbors:
+                neighbor_distance: float = vertex_distance + vertex.get_weight(neighbor)
+                if neighbor not in distance or neighbor_distance < distance[neighbor]:
+                    distance[neighbor] = neighbor_distance
+                    vertex_2_parent[neighbor] = vertex
+        return None
+
+    # Asyncio-friendly variants of the searches above: they yield control to the event loop every yield_every visited
+    # (or settled) vertexes, so that long searches on large graphs don't stall other tasks.
+    async def are_connected_async(self, start: Vertex[ValueType], end: Vertex[ValueType], yield_every: int = DEFAULT_YIELD_EVERY) -> bool:
+        self._validate_yield_every(yield_every)
+        return await self._run_cooperatively(self._breadth_first_search_steps(start, end, None, yield_every))
+
+    async def breadth_first_search_async(
+        self,
+        start: Vertex[ValueType],
+        end: Vertex[ValueType],
+        reverse: bool = True,
+        yield_every: int = DEFAULT_YIELD_EVERY,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
+        self._validate_yield_every(yield_every)
+        vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {}
+        if await self._run_cooperatively(
+            self._breadth_first_search_steps(start, end, vertex_2_parent, yield_every, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter)
+        ):
+            return self._get_path(end, vertex_2_parent, reverse)
+        return None
+
+    async def dijkstra_async(
+        self,
+        start: Vertex[ValueType],
+        end: Vertex[ValueType],
+        reverse: bool = True,
+        yield_every: int = DEFAULT_YIELD_EVERY,
+        *,
+        max_hops: Optional[int] = None,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
+        self._validate_yield_every(yield_every)
+        vertex_2_parent: Dict[Vertex[ValueType], Optional[Vertex[ValueType]]] = {}
+        if await self._run_cooperatively(
+            self._dijkstra_steps(start, end, vertex_2_parent, yield_every, max_hops=max_hops, vertex_filter=vertex_filter, edge_filter=edge_filter)
+        ):
+            return self._get_path(end, vertex_2_parent, reverse)
         return None
+
+    @staticmethod
+    def _validate_max_hops(max_hops: Optional[int]) -> None:
+        if max_hops is not None and (not isinstance(max_hops, int) or max_hops < 0):
+            raise ValueError(f"max_hops must be a non-negative integer: {repr(max_hops)}")
+
+    @staticmethod
+    def _validate_yield_every(yield_every: int) -> None:
+        if not isinstance(yield_every, int) or yield_every <= 0:
+            raise ValueError(f"yield_every must be a positive integer: {repr(yield_every)}")
@@ -0,0 +1,144 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from typing import Callable, Generic, Iterator, List, Optional
+
+from prezzemolo.graph import Graph
+from prezzemolo.utility import ValueType, to_string
+from prezzemolo.vertex import Vertex
+
+
+# Read-only subgraph of a Graph, defined by a vertex predicate and an edge predicate (source, target): nothing is copied and
+# predicates are evaluated lazily, only on the vertexes and edges reached by each search. Views reflect later changes to
+# the underlying graph and can be narrowed further with view().
+class GraphView(Generic[ValueType]):
+    def __init__(
+        self,
+        graph: Graph[ValueType],
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> None:
+        if not isinstance(graph, Graph):
+            raise TypeError(f"graph is not a Graph: {repr(graph)}")
+        self.__graph: Graph[ValueType] = graph
+        self.__vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = vertex_filter
+        self.__edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = edge_filter
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(graph={stringify(self.graph)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"graph={stringify(self.graph)}")
+        class_specific_data.append(f"vertex_filter={stringify(self.vertex_filter)}")
+        class_specific_data.append(f"edge_filter={stringify(self.edge_filter)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    @property
+    def graph(self) -> Graph[ValueType]:
+        return self.__graph
+
+    @property
+    def vertex_filter(self) -> Optional[Callable[[Vertex[ValueType]], bool]]:
+        return self.__vertex_filter
+
+    @property
+    def edge_filter(self) -> Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]]:
+        return self.__edge_filter
+
+    @property
+    def vertexes(self) -> Iterator[Vertex[ValueType]]:
+        return (vertex for vertex in self.__graph.vertexes if self._accepts_vertex(vertex))
+
+    def has_vertex(self, vertex: Vertex[ValueType]) -> bool:
+        return self._accepts_vertex(vertex)
+
+    def has_edge(self, source: Vertex[ValueType], target: Vertex[ValueType]) -> bool:
+        return (
+            source.has_neighbor(target)
+            and self._accepts_vertex(source)
+            and self._accepts_vertex(target)
+            and (self.__edge_filter is None or self.__edge_filter(source, target))
+        )
+
+    # Returns a narrower view: vertexes and edges must satisfy the predicates of both views.
+    def view(
+        self,
+        vertex_filter: Optional[Callable[[Vertex[ValueType]], bool]] = None,
+        edge_filter: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]] = None,
+    ) -> "GraphView[ValueType]":
+        return GraphView(
+            self.__graph,
+            vertex_filter=self._combine_vertex_filters(self.__vertex_filter, vertex_filter),
+            edge_filter=self._combine_edge_filters(self.__edge_filter, edge_filter),
+        )
+
+    def are_connected(self, start: Vertex[ValueType], end: Vertex[ValueType], max_hops: Optional[int] = None) -> bool:
+        return self.breadth_first_search(start, end, max_hops=max_hops) is not None
+
+    def breadth_first_search(
+        self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True, max_hops: Optional[int] = None
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
+        return self.__graph.breadth_first_search(
+            start, end, reverse=reverse, max_hops=max_hops, vertex_filter=self.__vertex_filter, edge_filter=self.__edge_filter
+        )
+
+    def dijkstra(
+        self, start: Vertex[ValueType], end: Vertex[ValueType], reverse: bool = True, max_hops: Optional[int] = None
+    ) -> Optional[Iterator[Vertex[ValueType]]]:
+        return self.__graph.dijkstra(start, end, reverse=reverse, max_hops=max_hops, vertex_filter=self.__vertex_filter, edge_filter=self.__edge_filter)
+
+    def _accepts_vertex(self, vertex: Vertex[ValueType]) -> bool:
+        return vertex in self.__graph and (self.__vertex_filter is None or self.__vertex_filter(vertex))
+
+    @staticmethod
+    def _combine_vertex_filters(
+        filter_1: Optional[Callable[[Vertex[ValueType]], bool]], filter_2: Optional[Callable[[Vertex[ValueType]], bool]]
+    ) -> Optional[Callable[[Vertex[ValueType]], bool]]:
+        if filter_1 is None or filter_2 is None:
+            return filter_1 if filter_2 is None else filter_2
+        first_filter: Callable[[Vertex[ValueType]], bool] = filter_1
+        second_filter: Callable[[Vertex[ValueType]], bool] = filter_2
+
+        def combined_filter(vertex: Vertex[ValueType]) -> bool:
+            return first_filter(vertex) and second_filter(vertex)
+
+        return combined_filter
+
+    @staticmethod
+    def _combine_edge_filters(
+        filter_1: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]], filter_2: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]]
+    ) -> Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], bool]]:
+        if filter_1 is None or filter_2 is None:
+            return filter_1 if filter_2 is None else filter_2
+        first_filter: Callable[[Vertex[ValueType], Vertex[ValueType]], bool] = filter_1
+        second_filter: Callable[[Vertex[ValueType], Vertex[ValueType]], bool] = filter_2
+
+        def combined_filter(source: Vertex[ValueType], target: Vertex[ValueType]) -> bool:
+            return first_filter(source, target) and second_filter(source, target)
+
+        return combined_filter
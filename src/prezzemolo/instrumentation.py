@@ -0,0 +1,99 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from prezzemolo.utility import to_string
+
+
+# Statistics of one call to an instrumented operation: counters are summed across calls, high-water marks are maxed.
+@dataclass(frozen=True)
+class InstrumentationSample:
+    operation: str
+    duration: float
+    counters: Dict[str, int] = field(default_factory=dict)
+    high_water_marks: Dict[str, int] = field(default_factory=dict)
+
+
+# Opt-in statistics collector: pass an instance to AVLTree or Graph to collect per-operation call counts, timings, counters
+# and high-water marks. Structures created without one skip all bookkeeping. The optional callback is invoked with every
+# sample and can be used to forward statistics to a metrics system.
+class Instrumentation:
+    def __init__(self, callback: Optional[Callable[[InstrumentationSample], None]] = None) -> None:
+        self.__callback: Optional[Callable[[InstrumentationSample], None]] = callback
+        self.__call_counts: Dict[str, int] = {}
+        self.__durations: Dict[str, float] = {}
+        self.__counters: Dict[str, int] = {}
+        self.__high_water_marks: Dict[str, int] = {}
+
+    def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        class_specific_data: List[str] = []
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        if repr_format:
+            class_specific_data.append(f"{type(self).__name__}(call_counts={stringify(self.__call_counts)}")
+        else:
+            class_specific_data.append(f"{type(self).__name__}:")
+            class_specific_data.append(f"call_counts={stringify(self.__call_counts)}")
+        class_specific_data.append(f"durations={stringify(self.__durations)}")
+        class_specific_data.append(f"counters={stringify(self.__counters)}")
+        class_specific_data.append(f"high_water_marks={stringify(self.__high_water_marks)}")
+
+        if extra_data:
+            class_specific_data.extend(extra_data)
+
+        return to_string(indent=indent, repr_format=repr_format, data=class_specific_data)
+
+    def __str__(self) -> str:
+        return self.to_string(indent=0, repr_format=False)
+
+    def __repr__(self) -> str:
+        return self.to_string(indent=0, repr_format=True)
+
+    # Counter and high-water mark names are prefixed with the operation name (e.g. "dijkstra.edges_relaxed").
+    def record(self, sample: InstrumentationSample) -> None:
+        self.__call_counts[sample.operation] = self.__call_counts.get(sample.operation, 0) + 1
+        self.__durations[sample.operation] = self.__durations.get(sample.operation, 0.0) + sample.duration
+        for name, value in sample.counters.items():
+            qualified_name: str = f"{sample.operation}.{name}"
+            self.__counters[qualified_name] = self.__counters.get(qualified_name, 0) + value
+        for name, value in sample.high_water_marks.items():
+            qualified_name = f"{sample.operation}.{name}"
+            self.__high_water_marks[qualified_name] = max(self.__high_water_marks.get(qualified_name, value), value)
+        if self.__callback is not None:
+            self.__callback(sample)
+
+    def reset(self) -> None:
+        self.__call_counts.clear()
+        self.__durations.clear()
+        self.__counters.clear()
+        self.__high_water_marks.clear()
+
+    @property
+    def call_counts(self) -> Dict[str, int]:
+        return dict(self.__call_counts)
+
+    # Cumulative durations in seconds
+    @property
+    def durations(self) -> Dict[str, float]:
+        return dict(self.__durations)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        return dict(self.__counters)
+
+    @property
+    def high_water_marks(self) -> Dict[str, int]:
+        return dict(self.__high_water_marks)
@@ -0,0 +1,118 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Optional, cast
+
+from prezzemolo.avl_tree import AVLNode, AVLTree
+from prezzemolo.instrumentation import Instrumentation
+from prezzemolo.utility import KeyType, ValueType
+
+
+# Half-open interval [start, end) with its value (e.g. a rate and its validity window)
+@dataclass(frozen=True)
+class Interval(Generic[KeyType, ValueType]):
+    start: KeyType
+    end: KeyType
+    value: ValueType
+
+
+# AVL node augmented with the end of its interval and the maximum end of the intervals in its subtree
+class IntervalNode(AVLNode[KeyType, ValueType]):
+    def __init__(self, key: KeyType, value: ValueType, end: KeyType) -> None:
+        AVLNode.__init__(self, key, value)
+        self.__end: KeyType = end
+        self.__max_end: KeyType = end
+
+    def _get_extra_data(self, repr_format: bool) -> List[str]:
+        stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
+        return [f"end={stringify(self.end)}", f"max_end={stringify(self.max_end)}"]
+
+    @property
+    def end(self) -> KeyType:
+        return self.__end
+
+    @property
+    def max_end(self) -> KeyType:
+        return self.__max_end
+
+    @max_end.setter
+    def max_end(self, max_end: KeyType) -> None:
+        self.__max_end = max_end
+
+
+# Interval tree: an AVLTree keyed by interval start, whose nodes also track the maximum interval end of their subtree (kept
+# up to date by the AVL balancing code through the _update_node() hook). Stabbing and overlap queries prune the subtrees
+# whose intervals all end before the query starts and those whose intervals all start after the query ends, so they run in
+# O(log n + k) for k results on typical data (O(min(n, k log n)) in the worst case). Duplicate and nested intervals are
+# allowed. Results are returned in start order.
+class IntervalTree(AVLTree[KeyType, Interval[KeyType, ValueType]]):
+    def __init__(self, instrumentation: Optional[Instrumentation] = None) -> None:
+        super().__init__(instrumentation=instrumentation)
+
+    def insert_interval(self, start: KeyType, end: KeyType, value: ValueType) -> None:
+        if not start < end:
+            raise ValueError(f"IntervalTree: interval start must be less than end: [{start}, {end})")
+        self.insert_node(start, Interval(start, end, value))
+
+    # Stabbing query: intervals containing point (start <= point < end)
+    def find_intervals_containing(self, point: KeyType) -> List[Interval[KeyType, ValueType]]:
+        return self._find_intervals(point, point, inclusive_end=True)
+
+    # Overlap query: intervals sharing at least one point with [start, end)
+    def find_intervals_overlapping(self, start: KeyType, end: KeyType) -> List[Interval[KeyType, ValueType]]:
+        if not start < end:
+            raise ValueError(f"IntervalTree: query start must be less than end: [{start}, {end})")
+        return self._find_intervals(start, end, inclusive_end=False)
+
+    # Returns the intervals with interval.end > start and interval.start < end (or interval.start <= end if inclusive_end),
+    # with an iterative in-order traversal.
+    def _find_intervals(self, start: KeyType, end: KeyType, inclusive_end: bool) -> List[Interval[KeyType, ValueType]]:
+        result: List[Interval[KeyType, ValueType]] = []
+        stack: List[IntervalNode[KeyType, Interval[KeyType, ValueType]]] = []
+        # All nodes are created by _create_node()
+        node: Optional[IntervalNode[KeyType, Interval[KeyType, ValueType]]] = cast(Optional[IntervalNode[KeyType, Interval[KeyType, ValueType]]], self.root)
+        try:
+            while True:
+                # Descend left, skipping subtrees whose intervals all end at or before start
+                while node is not None and start < node.max_end:
+                    stack.append(node)
+                    node = cast(Optional[IntervalNode[KeyType, Interval[KeyType, ValueType]]], node.left)
+                if not stack:
+                    break
+                current_node: IntervalNode[KeyType, Interval[KeyType, ValueType]] = stack.pop()
+                if (current_node.key < end) if not inclusive_end else not end < current_node.key:
+                    if start < current_node.end:
+                        result.append(current_node.value)
+                    node = cast(Optional[IntervalNode[KeyType, Interval[KeyType, ValueType]]], current_node.right)
+                else:
+                    # Keys of the right subtree and of the remaining ancestors are even larger
+                    break
+        except TypeError as exc:
+            raise TypeError("IntervalTree: keys are not comparable") from exc
+        return result
+
+    def _create_node(self, key: KeyType, value: Interval[KeyType, ValueType]) -> AVLNode[KeyType, Interval[KeyType, ValueType]]:
+        return IntervalNode(key, value, value.end)
+
+    def _update_node(self, node: AVLNode[KeyType, Interval[KeyType, ValueType]]) -> None:
+        AVLTree._update_node(self, node)
+        # All nodes are created by _create_node()
+        interval_node: IntervalNode[KeyType, Interval[KeyType, ValueType]] = cast(IntervalNode[KeyType, Interval[KeyType, ValueType]], node)
+        max_end: KeyType = interval_node.end
+        for child in (node.left, node.right):
+            if child is not None:
+                max_end = max(max_end, cast(IntervalNode[KeyType, Interval[KeyType, ValueType]], child).max_end)
+        interval_node.max_end = max_end
@@ -0,0 +1,287 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections import OrderedDict
+from typing import Dict, Generic, Iterable, Iterator, List, Set
+
+from prezzemolo.utility import ValueType
+from prezzemolo.vertex import Vertex
+
+# Maximum number of source components whose reachable set is cached (each cached set has up to one entry per component)
+DEFAULT_CACHE_SIZE: int = 128
+
+
+# Reachability index: vertexes are grouped into strongly connected components (computed with Tarjan's algorithm), which are
+# kept in a union-find forest so that they can be merged incrementally when new edges close a cycle. Components are linked by
+# the edges of the condensation DAG, whose topological order is maintained incrementally with the Pearce-Kelly algorithm: a
+# new edge only reorders (and searches) the components lying between its endpoints in the order, and a cycle can only be
+# closed by an edge going backwards in the order. Two vertexes in the same component are connected in O(α(n)): for graphs
+# with bidirectional edges this is always the case, because every component is a connected component and the DAG has no
+# edges. A component can't reach one that precedes it in the topological order. Otherwise the set of components reachable
+# from the source component is computed and kept in a bounded LRU cache until an edge addition invalidates it.
+class ReachabilityIndex(Generic[ValueType]):
+    def __init__(self, vertexes: Iterable[Vertex[ValueType]], cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        if not isinstance(cache_size, int) or cache_size < 1:
+            raise ValueError(f"cache_size must be a positive integer: {repr(cache_size)}")
+        self.__cache_size: int = cache_size
+        self.__vertex_2_component: Dict[Vertex[ValueType], int] = {}
+        self.__component_2_parent: List[int] = []
+        self.__component_2_rank: List[int] = []
+        # Position of each representative component in the topological order of the condensation DAG (not contiguous)
+        self.__component_2_order: List[int] = []
+        # Condensation DAG: keys and values are always representative components
+        self.__successors: Dict[int, Set[int]] = {}
+        self.__predecessors: Dict[int, Set[int]] = {}
+        # LRU cache: least recently used entries come first
+        self.__component_2_reachable_components: "OrderedDict[int, Set[int]]" = OrderedDict()
+
+        self._add_strongly_connected_components(vertexes)
+        self.__lowest_order: int = -len(self.__component_2_order)
+        self.__highest_order: int = 0
+        for vertex, component in self.__vertex_2_component.items():
+            for neighbor in vertex.neighbors:
+                self._add_dag_edge(component, self.__vertex_2_component[neighbor])
+
+    def __contains__(self, vertex: Vertex[ValueType]) -> bool:
+        return vertex in self.__vertex_2_component
+
+    @property
+    def cache_size(self) -> int:
+        return self.__cache_size
+
+    # Number of source components whose reachable set is currently cached
+    @property
+    def cached_component_count(self) -> int:
+        return len(self.__component_2_reachable_components)
+
+    def are_connected(self, start: Vertex[ValueType], end: Vertex[ValueType]) -> bool:
+        if end not in self.__vertex_2_component:
+            # The index contains every vertex reachable from the indexed ones
+            return False
+        start_component: int = self._find(self.__vertex_2_component[start])
+        end_component: int = self._find(self.__vertex_2_component[end])
+        if start_component == end_component:
+            return True
+        if self.__component_2_order[end_component] < self.__component_2_order[start_component]:
+            return False
+        return end_component in self._get_reachable_components(start_component)
+
+    # Returns False if the index can't be updated incrementally (the vertex has neighbors that are not in the index).
+    def add_vertex(self, vertex: Vertex[ValueType]) -> bool:
+        if vertex in self.__vertex_2_component:
+            return True
+        neighbors: List[Vertex[ValueType]] = list(vertex.neighbors)
+        for neighbor in neighbors:
+            if neighbor not in self.__vertex_2_component:
+                return False
+        # A vertex that isn't in the index has no incoming edges from indexed vertexes, so it can't close a cycle and it
+        # doesn't change the reachability of other components. It goes first in the topological order if it has neighbors
+        # and last otherwise (so that appending vertexes to a path doesn't cause reordering when they get a predecessor).
+        order: int
+        if neighbors:
+            self.__lowest_order -= 1
+            order = self.__lowest_order
+        else:
+            self.__highest_order += 1
+            order = self.__highest_order
+        component: int = self._new_component(order)
+        self.__vertex_2_component[vertex] = component
+        for neighbor in neighbors:
+            self._add_dag_edge(component, self._find(self.__vertex_2_component[neighbor]))
+        return True
+
+    # Returns False if the index can't be updated incrementally (one of the two vertexes is not in the index).
+    def add_edge(self, source: Vertex[ValueType], target: Vertex[ValueType]) -> bool:
+        if source not in self.__vertex_2_component or target not in self.__vertex_2_component:
+            return False
+        source_component: int = self._find(self.__vertex_2_component[source])
+        target_component: int = self._find(self.__vertex_2_component[target])
+        if source_component == target_component or target_component in self.__successors[source_component]:
+            return True
+        component_2_order: List[int] = self.__component_2_order
+        source_order: int = component_2_order[source_component]
+        target_order: int = component_2_order[target_component]
+        if source_order > target_order:
+            # Pearce-Kelly: only components ordered between target and source can be affected. Search forward from target
+            # and backward from source within that range: if the forward search finds source, the edge closes a cycle.
+            forward: Set[int] = self._traverse_range(target_component, self.__successors, target_order, source_order)
+            backward: Set[int] = self._traverse_range(source_component, self.__predecessors, target_order, source_order)
+            slots: List[int] = sorted(component_2_order[component] for component in forward | backward)
+            backward_components: List[int]
+            forward_components: List[int]
+            if source_component in forward:
+                # The new edge closes a cycle: merge all components lying on paths from target to source
+                cycle: Set[int] = forward & backward
+                backward_components = sorted(backward - cycle, key=component_2_order.__getitem__)
+                backward_components.append(self._merge_components(cycle))
+                forward_components = sorted(forward - cycle, key=component_2_order.__getitem__)
+                self.__component_2_reachable_components.clear()
+            else:
+                self._add_dag_edge(source_component, target_component)
+                backward_components = sorted(backward, key=component_2_order.__getitem__)
+                forward_components = sorted(forward, key=component_2_order.__getitem__)
+                self._invalidate_reachable_components(source_component, target_component)
+            # Components that reach source take the lowest positions and those reachable from target the highest ones, so
+            # that no component moves past a neighbor that was searched (merging leaves unused positions in between).
+            for component, order in zip(backward_components, slots):
+                component_2_order[component] = order
+            for component, order in zip(forward_components, slots[len(slots) - len(forward_components) :]):
+                component_2_order[component] = order
+        else:
+            self._add_dag_edge(source_component, target_component)
+            self._invalidate_reachable_components(source_component, target_component)
+        return True
+
+    # Iterative version of Tarjan's strongly connected components algorithm (avoids hitting the recursion limit on large graphs).
+    def _add_strongly_connected_components(self, vertexes: Iterable[Vertex[ValueType]]) -> None:
+        vertex_2_index: Dict[Vertex[ValueType], int] = {}
+        vertex_2_lowlink: Dict[Vertex[ValueType], int] = {}
+        component_stack: List[Vertex[ValueType]] = []
+        on_component_stack: Set[Vertex[ValueType]] = set()
+        call_stack_vertexes: List[Vertex[ValueType]] = []
+        call_stack_neighbors: List[Iterator[Vertex[ValueType]]] = []
+
+        for root in vertexes:
+            if root in vertex_2_index:
+                continue
+            vertex_2_index[root] = vertex_2_lowlink[root] = len(vertex_2_index)
+            component_stack.append(root)
+            on_component_stack.add(root)
+            call_stack_vertexes.append(root)
+            call_stack_neighbors.append(root.neighbors)
+
+            while call_stack_vertexes:
+                vertex: Vertex[ValueType] = call_stack_vertexes[-1]
+                descended: bool = False
+                for neighbor in call_stack_neighbors[-1]:
+                    if neighbor not in vertex_2_index:
+                        vertex_2_index[neighbor] = vertex_2_lowlink[neighbor] = len(vertex_2_index)
+                        component_stack.append(neighbor)
+                        on_component_stack.add(neighbor)
+                        call_stack_vertexes.append(neighbor)
+                        call_stack_neighbors.append(neighbor.neighbors)
+                        descended = True
+                        break
+                    if neighbor in on_component_stack:
+                        vertex_2_lowlink[vertex] = min(vertex_2_lowlink[vertex], vertex_2_index[neighbor])
+                if descended:
+                    continue
+
+                call_stack_vertexes.pop()
+                call_stack_neighbors.pop()
+                if vertex_2_lowlink[vertex] == vertex_2_index[vertex]:
+                    # Found in reverse topological order
+                    component: int = self._new_component(-len(self.__component_2_order))
+                    while True:
+                        member: Vertex[ValueType] = component_stack.pop()
+                        on_component_stack.remove(member)
+                        self.__vertex_2_component[member] = component
+                        if member == vertex:
+                            break
+                if call_stack_vertexes:
+                    parent: Vertex[ValueType] = call_stack_vertexes[-1]
+                    vertex_2_lowlink[parent] = min(vertex_2_lowlink[parent], vertex_2_lowlink[vertex])
+
+    def _new_component(self, order: int) -> int:
+        component: int = len(self.__component_2_parent)
+        self.__component_2_parent.append(component)
+        self.__component_2_rank.append(0)
+        self.__component_2_order.append(order)
+        self.__successors[component] = set()
+        self.__predecessors[component] = set()
+        return component
+
+    # Union-find lookup with path halving
+    def _find(self, component: int) -> int:
+        component_2_parent: List[int] = self.__component_2_parent
+        while component_2_parent[component] != component:
+            component_2_parent[component] = component_2_parent[component_2_parent[component]]
+            component = component_2_parent[component]
+        return component
+
+    def _add_dag_edge(self, source_component: int, target_component: int) -> None:
+        if source_component != target_component:
+            self.__successors[source_component].add(target_component)
+            self.__predecessors[target_component].add(source_component)
+
+    def _get_reachable_components(self, source_component: int) -> Set[int]:
+        result: Set[int]
+        cache: "OrderedDict[int, Set[int]]" = self.__component_2_reachable_components
+        if source_component in cache:
+            cache.move_to_end(source_component)
+            return cache[source_component]
+        result = self._traverse(source_component, self.__successors)
+        cache[source_component] = result
+        if len(cache) > self.__cache_size:
+            cache.popitem(last=False)
+        return result
+
+    # Drops the cached sets that change when the edge source -> target is added: those containing source but not target (if
+    # they contain target they already contain everything target reaches).
+    def _invalidate_reachable_components(self, source_component: int, target_component: int) -> None:
+        stale_components: List[int] = [
+            component
+            for component, reachable_components in self.__component_2_reachable_components.items()
+            if source_component in reachable_components and target_component not in reachable_components
+        ]
+        for component in stale_components:
+            del self.__component_2_reachable_components[component]
+
+    @staticmethod
+    def _traverse(start_component: int, component_2_adjacent_components: Dict[int, Set[int]]) -> Set[int]:
+        result: Set[int] = {start_component}
+        stack: List[int] = [start_component]
+        while stack:
+            for adjacent_component in component_2_adjacent_components[stack.pop()]:
+                if adjacent_component not in result:
+                    result.add(adjacent_component)
+                    stack.append(adjacent_component)
+        return result
+
+    # Like _traverse(), but only visits components whose topological order is between lowest_order and highest_order.
+    def _traverse_range(self, start_component: int, component_2_adjacent_components: Dict[int, Set[int]], lowest_order: int, highest_order: int) -> Set[int]:
+        component_2_order: List[int] = self.__component_2_order
+        result: Set[int] = {start_component}
+        stack: List[int] = [start_component]
+        while stack:
+            for adjacent_component in component_2_adjacent_components[stack.pop()]:
+                if adjacent_component not in result and lowest_order <= component_2_order[adjacent_component] <= highest_order:
+                    result.add(adjacent_component)
+                    stack.append(adjacent_component)
+        return result
+
+    # Returns the representative of the merged component.
+    def _merge_components(self, components: Set[int]) -> int:
+        representative: int = max(components, key=self.__component_2_rank.__getitem__)
+        successors: Set[int] = set()
+        predecessors: Set[int] = set()
+        for component in components:
+            successors.update(self.__successors.pop(component))
+            predecessors.update(self.__predecessors.pop(component))
+            if component != representative:
+                self.__component_2_parent[component] = representative
+                if self.__component_2_rank[component] == self.__component_2_rank[representative]:
+                    self.__component_2_rank[representative] += 1
+        successors -= components
+        predecessors -= components
+        for successor in successors:
+            self.__predecessors[successor] -= components
+            self.__predecessors[successor].add(representative)
+        for predecessor in predecessors:
+            self.__successors[predecessor] -= components
+            self.__successors[predecessor].add(representative)
+        self.__successors[representative] = successors
+        self.__predecessors[representative] = predecessors
+        return representative
@@ -21,6 +21,9 @@ from typing import List, Optional, TypeVar
 KeyType = TypeVar("KeyType", int, datetime, Decimal, float, str)  # pylint: disable=invalid-name
 ValueType = TypeVar("ValueType")  # pylint: disable=invalid-name
 
+# Written in place of the parts of a structure that are left out of a bounded rendering (see AVLTree.render(), Graph.render())
+TRUNCATION_MARKER: str = "..."
+
 
 def to_string(indent: int = 0, repr_format: bool = True, data: Optional[List[str]] = None) -> str:
     padding: str
@@ -13,9 +13,14 @@
 # limitations under the License.
 
 
-from typing import Callable, Dict, Generic, Iterator, List, Optional
+import weakref
+from itertools import islice
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Sequence, TextIO, Tuple
 
-from prezzemolo.utility import ValueType, to_string
+from prezzemolo.utility import TRUNCATION_MARKER, ValueType, to_string
+
+# Default bound of to_string(), __str__() and __repr__(): further neighbors and weights are written as TRUNCATION_MARKER
+DEFAULT_REPR_MAX_NEIGHBORS: int = 100
 
 
 class Vertex(Generic[ValueType]):
@@ -24,8 +29,21 @@ class Vertex(Generic[ValueType]):
         self.__data: Optional[ValueType] = data
         self.__neighbors: Dict[Vertex[ValueType], Vertex[ValueType]] = {}
         self.__edge_weights: Dict[Vertex[ValueType], float] = {}
+        # Observers are weakly referenced, so that a vertex doesn't keep alive the graphs it was added to
+        self.__neighbor_observers: List["weakref.WeakMethod[Callable[[Vertex[ValueType], Vertex[ValueType]], None]]"] = []
+        # Neighbors of vertexes loaded from a graph file are materialized on first access (see _set_neighbor_loader())
+        self.__neighbor_loader: Optional[Callable[[], Tuple[List[Vertex[ValueType]], Sequence[float]]]] = None
 
     def to_string(self, indent: int = 0, repr_format: bool = True, extra_data: Optional[List[str]] = None) -> str:
+        return self._to_string(indent, repr_format, extra_data, DEFAULT_REPR_MAX_NEIGHBORS)
+
+    # Writes the vertex to output, in the same format as to_string(), with at most max_neighbors neighbors and weights.
+    def render(self, output: TextIO, repr_format: bool = True, *, max_neighbors: Optional[int] = None) -> None:
+        if max_neighbors is not None and (not isinstance(max_neighbors, int) or max_neighbors < 1):
+            raise ValueError(f"max_neighbors must be a positive integer: {repr(max_neighbors)}")
+        output.write(self._to_string(0, repr_format, None, max_neighbors))
+
+    def _to_string(self, indent: int, repr_format: bool, extra_data: Optional[List[str]], max_neighbors: Optional[int]) -> str:
         class_specific_data: List[str] = []
         stringify: Callable[[object], str] = repr if repr_format else str  # type: ignore[assignment]
         if repr_format:
@@ -34,8 +52,16 @@ class Vertex(Generic[ValueType]):
             class_specific_data.append(f"{type(self).__name__}:")
             class_specific_data.append(f"name={stringify(self.name)}")
         class_specific_data.append(f"data={stringify(self.data)}")
-        class_specific_data.append(f"neighbors=[{stringify(', '.join([neighbor.name for neighbor in self.neighbors]))}]")
-        class_specific_data.append(f"weights={stringify({neighbor.name:weight for neighbor, weight in self.__edge_weights.items()})}")
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
+        neighbor_names: List[str] = [neighbor.name for neighbor in islice(self.__neighbors, max_neighbors)]
+        if len(neighbor_names) < len(self.__neighbors):
+            neighbor_names.append(TRUNCATION_MARKER)
+        class_specific_data.append(f"neighbors=[{stringify(', '.join(neighbor_names))}]")
+        weights: str = stringify({neighbor.name: weight for neighbor, weight in islice(self.__edge_weights.items(), max_neighbors)})
+        if max_neighbors is not None and len(self.__edge_weights) > max_neighbors:
+            weights = f"{weights[:-1]}, {TRUNCATION_MARKER}}}"
+        class_specific_data.append(f"weights={weights}")
 
         if extra_data:
             class_specific_data.extend(extra_data)
@@ -82,21 +108,92 @@ class Vertex(Generic[ValueType]):
 
     @property
     def neighbors(self) -> Iterator["Vertex[ValueType]"]:
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
         return iter(self.__neighbors.keys())
 
+    # Number of live neighbor observers
+    @property
+    def neighbor_observer_count(self) -> int:
+        return len(self.__neighbor_observers)
+
     def add_neighbor(self, vertex: "Vertex[ValueType]", weight: float = 0.0) -> None:
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
         if vertex in self.__neighbors:
             raise ValueError(f"Vertex '{vertex.name}' has already been added to vertex '{self.name}'")
         self.__neighbors[vertex] = vertex
         if weight != 0.0:
             self.__edge_weights[vertex] = weight
+        if self.__neighbor_observers:
+            self._notify_neighbor_observers(vertex)
+
+    # Bulk version of add_neighbor(): neighbors and weights are parallel sequences.
+    def add_neighbors(self, neighbors: Sequence["Vertex[ValueType]"], weights: Sequence[float]) -> None:
+        if len(neighbors) != len(weights):
+            raise ValueError(f"Vertex '{self.name}': neighbors and weights have different lengths ({len(neighbors)} != {len(weights)})")
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
+        new_neighbors: Dict[Vertex[ValueType], Vertex[ValueType]] = dict(zip(neighbors, neighbors))
+        if len(new_neighbors) != len(neighbors) or any(neighbor in self.__neighbors for neighbor in new_neighbors):
+            raise ValueError(f"Some vertexes have already been added to vertex '{self.name}'")
+        self.__neighbors.update(new_neighbors)
+        self.__edge_weights.update((neighbor, weight) for neighbor, weight in zip(neighbors, weights) if weight != 0.0)
+        if self.__neighbor_observers:
+            for neighbor in neighbors:
+                self._notify_neighbor_observers(neighbor)
+
+    # The observer must be a bound method: it is called with this vertex and the new neighbor every time a neighbor is added.
+    # The observer is dropped as soon as its owner is garbage collected.
+    def add_neighbor_observer(self, observer: Callable[["Vertex[ValueType]", "Vertex[ValueType]"], None]) -> None:
+        # The callback references the vertex weakly, so that observer references don't create a reference cycle
+        vertex_reference: "weakref.ref[Vertex[ValueType]]" = weakref.ref(self)
+
+        def remove_observer(observer_reference: "weakref.WeakMethod[Callable[[Vertex[ValueType], Vertex[ValueType]], None]]") -> None:
+            vertex: Optional[Vertex[ValueType]] = vertex_reference()
+            if vertex is not None:
+                vertex._remove_neighbor_observer(observer_reference)  # pylint: disable=protected-access
+
+        self.__neighbor_observers.append(weakref.WeakMethod(observer, remove_observer))
+
+    def _remove_neighbor_observer(self, observer_reference: "weakref.WeakMethod[Callable[[Vertex[ValueType], Vertex[ValueType]], None]]") -> None:
+        # Compare by identity: live WeakMethods compare equal when they reference the same method
+        for index, candidate in enumerate(self.__neighbor_observers):
+            if candidate is observer_reference:
+                del self.__neighbor_observers[index]
+                return
+
+    def _notify_neighbor_observers(self, neighbor: "Vertex[ValueType]") -> None:
+        # Iterate over a copy: observers that die during notification remove themselves from the list
+        for observer_reference in tuple(self.__neighbor_observers):
+            observer: Optional[Callable[[Vertex[ValueType], Vertex[ValueType]], None]] = observer_reference()
+            if observer is not None:
+                observer(self, neighbor)
 
     def add_neighbor_bidirectional(self, vertex: "Vertex[ValueType]", weight: float = 0.0) -> None:
         self.add_neighbor(vertex, weight)
         vertex.add_neighbor(self, weight)
 
     def get_weight(self, neighbor: "Vertex[ValueType]") -> float:
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
         return self.__edge_weights[neighbor] if neighbor in self.__edge_weights else 0.0
 
     def has_neighbor(self, neighbor: "Vertex[ValueType]") -> bool:
+        if self.__neighbor_loader is not None:
+            self._load_neighbors()
         return neighbor in self.__neighbors
+
+    # Used by Graph.load(): loader returns the neighbors of the vertex and their weights (which are valid by construction) and
+    # is called at most once, the first time neighbors are accessed.
+    def _set_neighbor_loader(self, loader: Callable[[], Tuple[List["Vertex[ValueType]"], Sequence[float]]]) -> None:
+        self.__neighbor_loader = loader
+
+    def _load_neighbors(self) -> None:
+        loader: Optional[Callable[[], Tuple[List[Vertex[ValueType]], Sequence[float]]]] = self.__neighbor_loader
+        if loader is None:
+            return
+        self.__neighbor_loader = None
+        neighbors, weights = loader()
+        self.__neighbors.update(zip(neighbors, neighbors))
+        self.__edge_weights.update((neighbor, weight) for neighbor, weight in zip(neighbors, weights) if weight != 0.0)
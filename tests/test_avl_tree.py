@@ -13,11 +13,14 @@
 # limitations under the License.
 
 import logging
+import random
 import sys
 import unittest
-from typing import List, Optional
+from io import StringIO
+from typing import Dict, List, Optional
 
-from prezzemolo.avl_tree import AVLTree
+from prezzemolo.avl_tree import DEFAULT_REPR_MAX_NODES, AVLNode, AVLTree
+from prezzemolo.instrumentation import Instrumentation
 
 
 class TestAVLTree(unittest.TestCase):
@@ -134,6 +137,171 @@ class TestAVLTree(unittest.TestCase):
         ]:
             self.assertEqual(tree.find_max_value_less_than(threshold), expected_value, f"result != {expected_value}")
 
+    def test_append_optimized(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for batch_size in [1, 2, 7, 64]:
+            tree: AVLTree[int, int] = AVLTree()
+            append_optimized_tree: AVLTree[int, int] = AVLTree(append_optimized=True, append_batch_size=batch_size)
+            key: int = 0
+            for index in range(1000):
+                # Mostly increasing keys, with duplicates and some late (out of order) keys
+                key += randomizer.choice([0, 1, 1, 2, 5])
+                inserted_key: int = key - randomizer.randrange(50) if randomizer.random() < 0.1 else key
+                tree.insert_node(inserted_key, index)
+                append_optimized_tree.insert_node(inserted_key, index)
+                if index % 50 == 0:
+                    for query in range(-1, key + 2):
+                        self.assertEqual(append_optimized_tree.find_max_value_less_than(query), tree.find_max_value_less_than(query), f"{batch_size}: {query}")
+            for query in range(-1, key + 2):
+                self.assertEqual(append_optimized_tree.find_max_value_less_than(query), tree.find_max_value_less_than(query), f"{batch_size}: {query}")
+            append_optimized_tree.flush()
+            self._check_avl_invariants(append_optimized_tree.root)
+            self._check_avl_invariants(tree.root)
+
+    def test_append_optimized_rotations(self) -> None:
+        instrumentation: Instrumentation = Instrumentation()
+        append_optimized_instrumentation: Instrumentation = Instrumentation()
+        tree: AVLTree[int, int] = AVLTree(instrumentation=instrumentation)
+        append_optimized_tree: AVLTree[int, int] = AVLTree(instrumentation=append_optimized_instrumentation, append_optimized=True)
+        for key in range(10000):
+            tree.insert_node(key, key)
+            append_optimized_tree.insert_node(key, key)
+        self.assertEqual(append_optimized_tree.find_max_value_less_than(9999), 9999)
+        self.assertEqual(append_optimized_tree.find_max_value_less_than(5000), 5000)
+        self.assertGreater(instrumentation.counters["insert_node.rotations"], 9900)
+        self.assertLess(append_optimized_instrumentation.counters["insert_node.rotations"], 200)
+        append_optimized_tree.flush()
+        self._check_avl_invariants(append_optimized_tree.root)
+
+        with self.assertRaisesRegex(ValueError, "append_batch_size must be a positive integer"):
+            AVLTree(append_optimized=True, append_batch_size=0)
+
+    def test_append_optimized_tail_buffer(self) -> None:
+        tree: AVLTree[int, str] = AVLTree(append_optimized=True, append_batch_size=4)
+        for key in range(6):
+            tree.insert_node(key, str(key))
+        # Rendering shows the tail buffer without merging it into the tree
+        self.assertEqual(
+            repr(tree),
+            "AVLTree(root=AVLNode(key=2, value='2', height=3, left=AVLNode(key=1, value='1', height=2, "
+            "left=AVLNode(key=0, value='0', height=1, left=None, right=None), right=None), "
+            "right=AVLNode(key=3, value='3', height=1, left=None, right=None)), tail=[(4, '4'), (5, '5')])",
+        )
+        root: Optional[AVLNode[int, str]] = tree.root
+        self.assertEqual(str(tree), "AVLTree:\n  root=" + str(root) + "\n  tail=[(4, 4), (5, 5)]")
+        output: StringIO = StringIO()
+        tree.render(output, max_nodes=1)
+        self.assertEqual(
+            output.getvalue(),
+            "AVLTree(root=AVLNode(key=2, value='2', height=3, left=..., right=...), tail=[(4, '4'), ...], size=6)",
+        )
+        self.assertIs(tree.root, root)
+        tree.flush()
+        self.assertNotIn("tail=", repr(tree))
+        self.assertIn("AVLNode(key=5, value='5'", repr(tree))
+        self.assertEqual(tree.size, 6)
+
+        # Keys are checked for comparability as in default mode, also when the tail buffer is searched
+        tree.insert_node(10, "10")
+        with self.assertRaisesRegex(TypeError, "keys are not comparable"):
+            tree.find_max_value_less_than("a")  # type: ignore
+
+    def test_upsert(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for append_optimized in [False, True]:
+            tree: AVLTree[int, int] = AVLTree(append_optimized=append_optimized, append_batch_size=8, upsert=True)
+            key_2_value: Dict[int, int] = {}
+            for index in range(2000):
+                key: int = index // 4 - randomizer.randrange(3) if append_optimized else randomizer.randrange(100)
+                tree.insert_node(key, index)
+                key_2_value[key] = index
+            self.assertEqual(tree.size, len(key_2_value))
+            for query in range(-5, max(key_2_value) + 2):
+                expected_key: int = max((key for key in key_2_value if key <= query), default=-sys.maxsize)
+                self.assertEqual(tree.find_max_value_less_than(query), key_2_value.get(expected_key), f"{append_optimized}: {query}")
+            tree.flush()
+            self._check_avl_invariants(tree.root)
+
+        duplicates_tree: AVLTree[int, int] = AVLTree()
+        for index in range(10):
+            duplicates_tree.insert_node(1, index)
+        self.assertEqual(duplicates_tree.size, 10)
+        # Empty trees are truthy, like any object without __len__()
+        empty_tree: AVLTree[int, int] = AVLTree()
+        self.assertTrue(empty_tree)
+        self.assertEqual(empty_tree.size, 0)
+        self.assertEqual(duplicates_tree.find_max_value_less_than(1), 9)
+
+    def test_upsert_combine(self) -> None:
+        tree: AVLTree[int, List[int]] = AVLTree(upsert=True, combine=self._concatenate)
+        tree.insert_node(2, [1])
+        tree.insert_node(1, [2])
+        tree.insert_node(2, [3])
+        tree.insert_node(2, [4])
+        self.assertEqual(
+            repr(tree),
+            "AVLTree(root=AVLNode(key=2, value=[1, 3, 4], height=2, left=AVLNode(key=1, value=[2], height=1, left=None, right=None), right=None))",
+        )
+        self.assertEqual(tree.size, 2)
+
+        with self.assertRaisesRegex(ValueError, "combine requires upsert mode"):
+            AVLTree(combine=self._concatenate)
+
+    def test_render(self) -> None:
+        tree: AVLTree[int, int] = self._populate_with_numbers([48, 13, 92, 99, 2])
+        for repr_format in [True, False]:
+            output: StringIO = StringIO()
+            tree.render(output, repr_format)
+            self.assertEqual(output.getvalue(), tree.to_string(repr_format=repr_format))
+
+        output = StringIO()
+        tree.render(output, max_depth=2)
+        self.assertEqual(
+            output.getvalue(),
+            "AVLTree(root=AVLNode(key=48, value=48, height=3, left=AVLNode(key=13, value=13, height=2, left=..., right=None), "
+            "right=AVLNode(key=92, value=92, height=2, left=None, right=...)), size=5)",
+        )
+        output = StringIO()
+        tree.render(output, repr_format=False, max_nodes=2)
+        self.assertEqual(
+            output.getvalue(),
+            "AVLTree:\n  root=AVLNode:\n  key=48\n  value=48\n  height=3\n  left=AVLNode:\n  key=13\n  value=13\n  height=2\n  left=...\n  right=None"
+            "\n  right=...\n  size=5",
+        )
+        with self.assertRaisesRegex(ValueError, "max_depth must be a positive integer"):
+            tree.render(StringIO(), max_depth=0)
+        with self.assertRaisesRegex(ValueError, "max_nodes must be a positive integer"):
+            tree.render(StringIO(), max_nodes=0)
+
+        # The default representation of large trees is summarized
+        large_tree: AVLTree[int, int] = AVLTree()
+        for value in range(10000):
+            large_tree.insert_node(value, value)
+        self.assertEqual(repr(large_tree).count("AVLNode("), DEFAULT_REPR_MAX_NODES)
+        self.assertTrue(repr(large_tree).endswith(", size=10000)"))
+        self.assertEqual(str(large_tree).count("AVLNode:"), DEFAULT_REPR_MAX_NODES)
+        output = StringIO()
+        large_tree.render(output)
+        self.assertEqual(output.getvalue().count("AVLNode("), 10000)
+
+    @staticmethod
+    def _concatenate(old_value: List[int], new_value: List[int]) -> List[int]:
+        return old_value + new_value
+
+    # Checks ordering, heights and balance of the subtree and returns its height
+    def _check_avl_invariants(self, root: Optional[AVLNode[int, int]]) -> int:
+        if root is None:
+            return 0
+        if root.left is not None:
+            self.assertLessEqual(root.left.key, root.key)
+        if root.right is not None:
+            self.assertGreaterEqual(root.right.key, root.key)
+        left_height: int = self._check_avl_invariants(root.left)
+        right_height: int = self._check_avl_invariants(root.right)
+        self.assertLessEqual(abs(left_height - right_height), 1)
+        self.assertEqual(root.height, 1 + max(left_height, right_height))
+        return root.height
+
 
 if __name__ == "__main__":
     logging.basicConfig(stream=sys.stderr)
@@ -0,0 +1,105 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import sys
+import unittest
+from typing import List, Tuple
+
+from prezzemolo.avl_tree import AVLTree
+from prezzemolo.b_plus_tree import BPlusTree, BPlusTreeInternalNode
+
+
+class TestBPlusTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None  # pylint: disable=invalid-name
+
+    def test_insert(self) -> None:
+        tree: BPlusTree[int, int] = BPlusTree(fanout=3)
+        for value in [48, 13, 92, 99, 2, 12, 6]:
+            tree.insert_node(value, value)
+        self.assertEqual(
+            repr(tree),
+            "BPlusTree(fanout=3, root=BPlusTreeInternalNode(keys=[48], children=["
+            "BPlusTreeInternalNode(keys=[12], children=[BPlusTreeLeaf(keys=[2, 6], values=[2, 6]), BPlusTreeLeaf(keys=[12, 13], values=[12, 13])]), "
+            "BPlusTreeInternalNode(keys=[99], children=[BPlusTreeLeaf(keys=[48, 92], values=[48, 92]), BPlusTreeLeaf(keys=[99], values=[99])])]))",
+        )
+        self.assertEqual(tree.height, 3)
+        self.assertEqual(len(tree), 7)
+
+    def test_find(self) -> None:
+        tree: BPlusTree[int, int] = BPlusTree(fanout=3)
+        self.assertIsNone(tree.find_max_value_less_than(0))
+        for value in [48, 13, 92, 99, 2, 12, 6, 57, 22]:
+            tree.insert_node(value, value)
+
+        for threshold, expected_value in [(0, None), (1, None), (2, 2), (9, 6), (22, 22), (72, 57), (98, 92), (100, 99), (1000, 99)]:
+            self.assertEqual(tree.find_max_value_less_than(threshold), expected_value, f"result != {expected_value}")
+
+        with self.assertRaisesRegex(TypeError, "BPlusTree: keys are not comparable"):
+            tree.find_max_value_less_than("a")  # type: ignore
+        with self.assertRaisesRegex(ValueError, "fanout must be an integer greater than 2"):
+            BPlusTree(fanout=2)
+
+    def test_random_keys_against_avl_tree(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for fanout in [3, 4, 5, 16]:
+            for sequential in [False, True]:
+                avl_tree: AVLTree[int, int] = AVLTree()
+                b_plus_tree: BPlusTree[int, int] = BPlusTree(fanout=fanout)
+                items: List[Tuple[int, int]] = []
+                for index in range(2000):
+                    # Few distinct keys, to exercise duplicates spanning several leaves
+                    key: int = index // 3 if sequential else randomizer.randrange(300)
+                    avl_tree.insert_node(key, index)
+                    b_plus_tree.insert_node(key, index)
+                    items.append((key, index))
+                # Indexes increase with insertion order, so this is the order of keys with duplicates in insertion order
+                items.sort()
+                for query in range(-1, max(items)[0] + 2):
+                    self.assertEqual(b_plus_tree.find_max_value_less_than(query), avl_tree.find_max_value_less_than(query), f"{fanout}: {query}")
+
+                self.assertEqual(list(b_plus_tree.items()), items)
+                self.assertEqual(list(b_plus_tree.items(start_key=100, end_key=150)), [item for item in items if 100 <= item[0] < 150])
+                self.assertEqual(list(b_plus_tree.items(start_key=-5)), items)
+                self.assertEqual(list(b_plus_tree.items(start_key=10000)), [])
+                self._check_b_plus_tree_invariants(b_plus_tree)
+
+    def test_sequential_keys_fill_leaves(self) -> None:
+        tree: BPlusTree[int, int] = BPlusTree(fanout=10)
+        for key in range(1000):
+            tree.insert_node(key, key)
+        self.assertEqual(tree.height, 3)
+        self.assertEqual(tree.find_max_value_less_than(500), 500)
+        self._check_b_plus_tree_invariants(tree)
+
+    def _check_b_plus_tree_invariants(self, tree: BPlusTree[int, int]) -> None:
+        nodes: List[object] = [tree.root]
+        for _ in range(tree.height - 1):
+            children: List[object] = []
+            for node in nodes:
+                assert isinstance(node, BPlusTreeInternalNode)
+                self.assertEqual(len(node.keys), len(node.children) - 1)
+                self.assertLessEqual(len(node.children), tree.fanout)
+                self.assertEqual(node.keys, sorted(node.keys))
+                children.extend(node.children)
+            nodes = children
+        self.assertFalse(any(isinstance(node, BPlusTreeInternalNode) for node in nodes))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,154 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import gc
+import logging
+import random
+import sys
+import unittest
+from typing import Iterator, List, Optional
+
+from prezzemolo.contraction_hierarchy import ContractionHierarchy
+from prezzemolo.graph import Graph
+from prezzemolo.vertex import Vertex
+
+
+# pylint: disable=invalid-name
+class TestContractionHierarchy(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    # Returns the total weight of the path, checking that consecutive vertexes are connected
+    def _get_path_weight(self, path: List[Vertex[int]]) -> float:
+        result: float = 0.0
+        for source, target in zip(path, path[1:]):
+            self.assertTrue(source.has_neighbor(target), f"{source.name} -> {target.name}")
+            result += source.get_weight(target)
+        return result
+
+    def test_shortcuts(self) -> None:
+        # Chain 0 -> 1 -> 2 -> 3 -> 4 with a longer direct edge 0 -> 4
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(5)]
+        for i in range(4):
+            vertexes[i].add_neighbor(vertexes[i + 1], 1.0)
+        vertexes[0].add_neighbor(vertexes[4], 10.0)
+        hierarchy: ContractionHierarchy[int] = ContractionHierarchy(Graph(vertexes))
+
+        path: Optional[Iterator[Vertex[int]]] = hierarchy.shortest_path(vertexes[0], vertexes[4], reverse=False)
+        assert path is not None
+        self.assertEqual([vertex.name for vertex in path], ["0", "1", "2", "3", "4"])
+        path = hierarchy.shortest_path(vertexes[0], vertexes[4])
+        assert path is not None
+        self.assertEqual([vertex.name for vertex in path], ["4", "3", "2", "1", "0"])
+        self.assertEqual(hierarchy.shortest_distance(vertexes[0], vertexes[4]), 4.0)
+        self.assertEqual(hierarchy.shortest_distance(vertexes[1], vertexes[3]), 2.0)
+        self.assertGreater(hierarchy.shortcut_count, 0)
+        self.assertEqual(hierarchy.core_vertex_count, 0)
+
+        path = hierarchy.shortest_path(vertexes[2], vertexes[2])
+        assert path is not None
+        self.assertEqual([vertex.name for vertex in path], ["2"])
+        self.assertEqual(hierarchy.shortest_distance(vertexes[2], vertexes[2]), 0.0)
+        self.assertIsNone(hierarchy.shortest_path(vertexes[4], vertexes[0]))
+        self.assertIsNone(hierarchy.shortest_distance(vertexes[4], vertexes[0]))
+
+    def test_errors(self) -> None:
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(3)]
+        vertexes[0].add_neighbor(vertexes[1], 1.0)
+        vertexes[1].add_neighbor(vertexes[2], -1.0)
+        with self.assertRaisesRegex(ValueError, "negative weight"):
+            ContractionHierarchy(Graph(vertexes))
+        with self.assertRaisesRegex(ValueError, "wasn't added to the graph"):
+            ContractionHierarchy(Graph(vertexes[:2]))
+        with self.assertRaisesRegex(TypeError, "graph is not a Graph"):
+            ContractionHierarchy(vertexes)  # type: ignore
+        with self.assertRaisesRegex(ValueError, "core_average_degree_limit must be a positive integer"):
+            ContractionHierarchy(Graph(vertexes[:1]), core_average_degree_limit=0)
+
+        vertexes = [Vertex[int](name=str(i), data=i) for i in range(3)]
+        vertexes[0].add_neighbor(vertexes[1], 1.0)
+        hierarchy: ContractionHierarchy[int] = ContractionHierarchy(Graph(vertexes[:2]))
+        self.assertFalse(vertexes[2] in hierarchy)
+        with self.assertRaisesRegex(ValueError, "is not in the contraction hierarchy"):
+            hierarchy.shortest_path(vertexes[0], vertexes[2])
+        with self.assertRaisesRegex(TypeError, "start is not a Vertex"):
+            hierarchy.shortest_path(None, vertexes[1])  # type: ignore
+
+        # Adding edges makes the hierarchy stale
+        self.assertFalse(hierarchy.is_stale)
+        vertexes[1].add_neighbor(vertexes[0], 1.0)
+        self.assertTrue(hierarchy.is_stale)
+        with self.assertRaisesRegex(ValueError, "build a new ContractionHierarchy"):
+            hierarchy.shortest_distance(vertexes[0], vertexes[1])
+
+    def test_neighbor_observers_are_released(self) -> None:
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(3)]
+        vertexes[0].add_neighbor(vertexes[1], 1.0)
+        vertexes[1].add_neighbor(vertexes[2], 1.0)
+        graph: Graph[int] = Graph(vertexes)
+        for _ in range(1000):
+            ContractionHierarchy(graph)
+        gc.collect()
+        # Only the graph's own observer is left
+        for vertex in vertexes:
+            self.assertEqual(vertex.neighbor_observer_count, 1)
+
+        hierarchy: ContractionHierarchy[int] = ContractionHierarchy(graph)
+        self.assertEqual(vertexes[0].neighbor_observer_count, 2)
+        vertexes[2].add_neighbor(vertexes[0], 1.0)
+        self.assertTrue(hierarchy.is_stale)
+        del hierarchy
+        gc.collect()
+        self.assertEqual(vertexes[0].neighbor_observer_count, 1)
+
+    def test_random_graphs_against_dijkstra(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for iteration in range(30):
+            vertex_count: int = randomizer.randrange(2, 40)
+            vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(vertex_count)]
+            for _ in range(randomizer.randrange(vertex_count * 4)):
+                source: Vertex[int] = randomizer.choice(vertexes)
+                target: Vertex[int] = randomizer.choice(vertexes)
+                if source.has_neighbor(target):
+                    continue
+                # Integer weights (including zero) keep path weights exact regardless of summation order
+                weight: float = float(randomizer.randrange(10))
+                if randomizer.random() < 0.5 and source is not target and not target.has_neighbor(source):
+                    source.add_neighbor_bidirectional(target, weight)
+                else:
+                    source.add_neighbor(target, weight)
+            graph: Graph[int] = Graph(vertexes)
+            # A low degree limit leaves part of the graph uncontracted as core
+            hierarchy: ContractionHierarchy[int] = ContractionHierarchy(graph, core_average_degree_limit=1 if iteration % 2 == 0 else 8)
+            for start in vertexes:
+                for end in vertexes:
+                    expected: Optional[Iterator[Vertex[int]]] = graph.dijkstra(start, end, reverse=False)
+                    actual: Optional[Iterator[Vertex[int]]] = hierarchy.shortest_path(start, end, reverse=False)
+                    if expected is None:
+                        self.assertIsNone(actual, f"{start.name} -> {end.name}")
+                        self.assertIsNone(hierarchy.shortest_distance(start, end))
+                        continue
+                    assert actual is not None
+                    actual_path: List[Vertex[int]] = list(actual)
+                    self.assertEqual(actual_path[0], start)
+                    self.assertEqual(actual_path[-1], end)
+                    expected_weight: float = self._get_path_weight(list(expected))
+                    self.assertEqual(self._get_path_weight(actual_path), expected_weight, f"{start.name} -> {end.name}")
+                    self.assertEqual(hierarchy.shortest_distance(start, end), expected_weight, f"{start.name} -> {end.name}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()
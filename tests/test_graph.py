@@ -12,17 +12,22 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import gc
 import logging
+import os
 import sys
+import tempfile
 import unittest
+from io import StringIO
 from typing import Dict, Iterator, List, Optional, Tuple
 
-from prezzemolo.graph import Graph
+from prezzemolo.graph import DEFAULT_REPR_MAX_VERTEXES, Graph
 from prezzemolo.utility import ValueType
-from prezzemolo.vertex import Vertex
+from prezzemolo.vertex import DEFAULT_REPR_MAX_NEIGHBORS, Vertex
 
 
-# pylint: disable=invalid-name
+# pylint: disable=invalid-name,too-many-public-methods
 class TestGraph(unittest.TestCase):
     def setUp(self) -> None:
         self.maxDiff = None
@@ -312,6 +317,235 @@ class TestGraph(unittest.TestCase):
         path = graph.dijkstra(vertexes["i"], vertexes["b"], reverse=False)
         self.assertIsNone(path)
 
+    def test_topological_order(self) -> None:
+        graph: Graph[str] = TestGraph._generate_graph([("a", "b", 1), ("a", "c", 1), ("c", "b", 1), ("b", "d", 1), ("e", "c", 1)])
+        order: List[str] = [vertex.name for vertex in graph.topological_order()]
+        self.assertEqual(sorted(order), ["a", "b", "c", "d", "e"])
+        for vertex in graph.vertexes:
+            for neighbor in vertex.neighbors:
+                self.assertLess(order.index(vertex.name), order.index(neighbor.name))
+
+        # Adding an edge invalidates the cached order
+        vertexes: Dict[str, Vertex[str]] = {v.name: v for v in graph.vertexes}
+        vertexes["d"].add_neighbor(vertexes["a"])
+        with self.assertRaisesRegex(ValueError, "Graph contains a cycle"):
+            graph.topological_order()
+        with self.assertRaisesRegex(ValueError, "Graph contains a cycle"):
+            graph.dag_shortest_path(vertexes["a"], vertexes["d"])
+
+    def test_dag_shortest_path(self) -> None:
+        graph: Graph[int] = TestGraph._generate_graph([(0, 1, 5), (0, 2, 2), (1, 3, 4), (1, 4, 1), (2, 1, 1), (2, 3, 7), (3, 4, 3), (5, 4, 1)])
+        vertexes: List[Vertex[int]] = list(graph.vertexes)
+        path = graph.dag_shortest_path(vertexes[0], vertexes[4], reverse=False)
+        assert path
+        self.assertEqual(list(path), [vertexes[0], vertexes[2], vertexes[1], vertexes[4]])
+
+        path = graph.dag_shortest_path(vertexes[0], vertexes[0])
+        assert path
+        self.assertEqual(list(path), [vertexes[0]])
+
+        self.assertIsNone(graph.dag_shortest_path(vertexes[4], vertexes[0]))
+        self.assertIsNone(graph.dag_shortest_path(vertexes[0], vertexes[5]))
+
+        # Negative weights
+        graph = TestGraph._generate_graph([(0, 1, 1), (0, 2, 4), (2, 1, -5), (1, 3, 1), (2, 3, 3)])
+        vertexes = list(graph.vertexes)
+        path = graph.dag_shortest_path(vertexes[0], vertexes[3], reverse=False)
+        assert path
+        path_as_list = list(path)
+        self.assertEqual(path_as_list, [vertexes[0], vertexes[2], vertexes[1], vertexes[3]])
+        self.assertEqual(TestGraph._get_path_total_weight(iter(path_as_list)), 0)
+
+    def test_negative_weights(self) -> None:
+        graph: Graph[int] = TestGraph._generate_graph([(0, 1, 4), (0, 2, 5), (1, 3, 3), (2, 1, -3), (3, 4, 2), (2, 4, 4), (4, 1, -1)])
+        vertexes: List[Vertex[int]] = list(graph.vertexes)
+        with self.assertRaisesRegex(ValueError, "Negative weight edge"):
+            graph.dijkstra(vertexes[0], vertexes[4])
+
+        path = graph.bellman_ford(vertexes[0], vertexes[4], reverse=False)
+        assert path
+        path_as_list = list(path)
+        self.assertEqual(path_as_list, [vertexes[0], vertexes[2], vertexes[1], vertexes[3], vertexes[4]])
+        self.assertEqual(TestGraph._get_path_total_weight(iter(path_as_list)), 7)
+        self.assertIsNone(graph.bellman_ford(vertexes[3], vertexes[0]))
+        self.assertIsNone(graph.find_negative_cycle())
+
+        graph.use_johnson_reweighting()
+        for start in vertexes:
+            for end in vertexes:
+                bellman_ford_path = graph.bellman_ford(start, end)
+                dijkstra_path = graph.dijkstra(start, end)
+                if bellman_ford_path is None or dijkstra_path is None:
+                    self.assertIsNone(bellman_ford_path)
+                    self.assertIsNone(dijkstra_path)
+                    continue
+                self.assertEqual(TestGraph._get_path_total_weight(dijkstra_path), TestGraph._get_path_total_weight(bellman_ford_path))
+
+        # Adding an edge invalidates the potentials
+        vertexes[4].add_neighbor(vertexes[0], -20)
+        with self.assertRaisesRegex(ValueError, "Graph contains a negative cycle"):
+            graph.dijkstra(vertexes[0], vertexes[4])
+        with self.assertRaisesRegex(ValueError, "Graph contains a negative cycle"):
+            graph.bellman_ford(vertexes[0], vertexes[4])
+        cycle = graph.find_negative_cycle()
+        assert cycle
+        cycle_as_list = list(cycle)
+        cycle_as_list.append(cycle_as_list[0])
+        self.assertLess(TestGraph._get_path_total_weight(iter(cycle_as_list)), 0)
+
+        graph.use_johnson_reweighting(False)
+        with self.assertRaisesRegex(ValueError, "Negative weight edge"):
+            graph.dijkstra(vertexes[0], vertexes[4])
+
+    def test_negative_cycle_not_reachable(self) -> None:
+        graph: Graph[int] = TestGraph._generate_graph([(0, 1, 2), (2, 3, 1), (3, 2, -2), (3, 1, 1)])
+        vertexes: List[Vertex[int]] = list(graph.vertexes)
+        path = graph.bellman_ford(vertexes[0], vertexes[1])
+        assert path
+        self.assertEqual(list(path), [vertexes[1], vertexes[0]])
+        cycle = graph.find_negative_cycle()
+        assert cycle
+        self.assertEqual(sorted(cycle), [vertexes[2], vertexes[3]])
+
+    def test_save_and_load(self) -> None:
+        graph: Graph[str] = TestGraph._generate_graph([("a", "b", 5), ("a", "c", 3), ("c", "b", 1), ("b", "d", 2), ("c", "d", 6), ("e", "a", 1), ("€", "a", 0)])
+        graph.add_vertex(Vertex[str](name="isolated"))
+        with tempfile.TemporaryDirectory() as directory:
+            file_path: str = os.path.join(directory, "graph.bin")
+            graph.save(file_path)
+            loaded_graph: Graph[str] = Graph.load(file_path)
+
+            with open(file_path, "wb") as file:
+                file.write(b"not a graph file")
+            with self.assertRaisesRegex(ValueError, "Not a graph file"):
+                Graph.load(file_path)
+
+        self.assertEqual([v.name for v in loaded_graph.vertexes], [v.name for v in graph.vertexes])
+        loaded_vertexes: Dict[str, Vertex[str]] = {v.name: v for v in loaded_graph.vertexes}
+        for vertex in graph.vertexes:
+            loaded_vertex: Vertex[str] = loaded_vertexes[vertex.name]
+            self.assertIsNone(loaded_vertex.data)
+            self.assertEqual([v.name for v in loaded_vertex.neighbors], [v.name for v in vertex.neighbors])
+            for neighbor in vertex.neighbors:
+                self.assertEqual(loaded_vertex.get_weight(loaded_vertexes[neighbor.name]), vertex.get_weight(neighbor))
+
+        path = loaded_graph.dijkstra(loaded_vertexes["e"], loaded_vertexes["d"], reverse=False)
+        assert path
+        self.assertEqual([v.name for v in path], ["e", "a", "c", "b", "d"])
+
+        # Neighbors of loaded vertexes are created lazily, and the graph starts observing a vertex at that point
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "graph.bin")
+            graph.save(file_path)
+            loaded_graph = Graph.load(file_path)
+        loaded_vertexes = {v.name: v for v in loaded_graph.vertexes}
+        self.assertEqual(loaded_vertexes["d"].neighbor_observer_count, 0)
+        self.assertFalse(loaded_graph.are_connected(loaded_vertexes["d"], loaded_vertexes["e"]))
+        self.assertEqual(loaded_vertexes["d"].neighbor_observer_count, 1)
+        loaded_vertexes["d"].add_neighbor(loaded_vertexes["e"], 1.0)
+        self.assertTrue(loaded_graph.are_connected(loaded_vertexes["d"], loaded_vertexes["e"]))
+        loaded_vertexes["isolated"].add_neighbor(loaded_vertexes["a"], 2.0)
+        self.assertTrue(loaded_graph.are_connected(loaded_vertexes["isolated"], loaded_vertexes["d"]))
+
+    def test_async_searches(self) -> None:
+        graph: Graph[str] = TestGraph._generate_graph([("a", "b", 5), ("a", "c", 3), ("c", "b", 1), ("b", "d", 2), ("c", "d", 6), ("e", "a", 1)])
+        vertexes: Dict[str, Vertex[str]] = {v.name: v for v in graph.vertexes}
+
+        async def run_searches() -> None:
+            self.assertTrue(await graph.are_connected_async(vertexes["a"], vertexes["d"], yield_every=1))
+            self.assertFalse(await graph.are_connected_async(vertexes["a"], vertexes["e"], yield_every=1))
+
+            path = await graph.breadth_first_search_async(vertexes["a"], vertexes["d"], reverse=False, yield_every=1)
+            assert path
+            self.assertEqual(list(path), [vertexes["a"], vertexes["b"], vertexes["d"]])
+
+            path = await graph.dijkstra_async(vertexes["a"], vertexes["d"], reverse=False, yield_every=1)
+            assert path
+            self.assertEqual(list(path), [vertexes["a"], vertexes["c"], vertexes["b"], vertexes["d"]])
+
+            path = await graph.dijkstra_async(vertexes["d"], vertexes["a"], yield_every=1)
+            self.assertIsNone(path)
+
+            with self.assertRaisesRegex(ValueError, "yield_every must be a positive integer"):
+                await graph.dijkstra_async(vertexes["a"], vertexes["d"], yield_every=0)
+
+        asyncio.run(run_searches())
+
+    def test_async_search_yields_and_is_cancellable(self) -> None:
+        graph: Graph[int] = TestGraph._generate_graph([(i, i + 1, 1) for i in range(1000)])
+        vertexes: Dict[int, Vertex[int]] = {int(v.name): v for v in graph.vertexes}
+
+        async def run_search() -> None:
+            ticks: List[int] = []
+
+            async def tick() -> None:
+                while True:
+                    ticks.append(len(ticks))
+                    await asyncio.sleep(0)
+
+            ticker = asyncio.ensure_future(tick())
+            path = await graph.dijkstra_async(vertexes[0], vertexes[1000], yield_every=10)
+            assert path
+            self.assertEqual(len(list(path)), 1001)
+            # Other tasks were scheduled while the search was in progress
+            self.assertGreater(len(ticks), 10)
+
+            search = asyncio.ensure_future(graph.breadth_first_search_async(vertexes[0], vertexes[1000], yield_every=1))
+            await asyncio.sleep(0)
+            search.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await search
+            ticker.cancel()
+
+        asyncio.run(run_search())
+
+    def test_render(self) -> None:
+        graph: Graph[int] = TestGraph._generate_graph([(0, 1, 2), (0, 2, 0), (1, 2, 3)])
+        self.assertEqual(
+            repr(graph),
+            "Graph(vertexes=[Vertex(name='0', data=0, neighbors=['1, 2'], weights={'1': 2}), Vertex(name='1', data=1, neighbors=['2'], weights={'2': 3}), "
+            "Vertex(name='2', data=2, neighbors=[''], weights={})])",
+        )
+        output: StringIO = StringIO()
+        graph.render(output, max_vertexes=1, max_neighbors=1)
+        self.assertEqual(output.getvalue(), "Graph(vertexes=[Vertex(name='0', data=0, neighbors=['1, ...'], weights={'1': 2}), ...], vertex_count=3)")
+        output = StringIO()
+        graph.render(output, repr_format=False)
+        self.assertEqual(output.getvalue(), str(graph))
+        with self.assertRaisesRegex(ValueError, "max_vertexes must be a positive integer"):
+            graph.render(StringIO(), max_vertexes=0)
+        with self.assertRaisesRegex(ValueError, "max_neighbors must be a positive integer"):
+            graph.render(StringIO(), max_neighbors=0)
+
+        # The default representation of large graphs and vertexes is summarized
+        hub: Vertex[int] = Vertex[int](name="hub", data=0)
+        spokes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(1000)]
+        hub.add_neighbors(spokes, [1.0] * len(spokes))
+        self.assertTrue(repr(hub).endswith(f"'{DEFAULT_REPR_MAX_NEIGHBORS - 1}': 1.0, ...}})"))
+        self.assertEqual(repr(hub).count(": 1.0"), DEFAULT_REPR_MAX_NEIGHBORS)
+        large_graph: Graph[int] = Graph([hub, *spokes])
+        self.assertEqual(repr(large_graph).count("Vertex("), DEFAULT_REPR_MAX_VERTEXES)
+        self.assertTrue(repr(large_graph).endswith(", ...], vertex_count=1001)"))
+
+    def test_neighbor_observers_are_released(self) -> None:
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(3)]
+        vertexes[0].add_neighbor(vertexes[1], 1.0)
+        for _ in range(1000):
+            Graph(vertexes)
+        gc.collect()
+        for vertex in vertexes:
+            self.assertEqual(vertex.neighbor_observer_count, 0)
+
+        # Live graphs are still notified
+        graph: Graph[int] = Graph(vertexes)
+        self.assertEqual(vertexes[0].neighbor_observer_count, 1)
+        self.assertFalse(graph.are_connected(vertexes[0], vertexes[2]))
+        vertexes[1].add_neighbor(vertexes[2], 1.0)
+        self.assertTrue(graph.are_connected(vertexes[0], vertexes[2]))
+        del graph
+        gc.collect()
+        self.assertEqual(vertexes[1].neighbor_observer_count, 0)
+
     @classmethod
     def _get_path_total_weight(cls, path: Iterator["Vertex[ValueType]"]) -> float:
         result: float = 0.0
@@ -0,0 +1,126 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import sys
+import unittest
+from typing import Dict, Iterator, List, Optional
+
+from prezzemolo.graph import Graph
+from prezzemolo.graph_view import GraphView
+from prezzemolo.vertex import Vertex
+
+
+class TestGraphView(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None  # pylint: disable=invalid-name
+        # Direct but expensive route 0->4 and cheap routes with more hops: 0->1->2->3->4 and 0->5->4 (via delisted 5)
+        self.vertexes: List[Vertex[str]] = [Vertex[str](name=str(i), data=str(i)) for i in range(6)]
+        for source, target, weight in [(0, 4, 10.0), (0, 1, 1.0), (1, 2, 1.0), (2, 3, 1.0), (3, 4, 1.0), (0, 5, 1.0), (5, 4, 2.0)]:
+            self.vertexes[source].add_neighbor(self.vertexes[target], weight)
+        self.graph: Graph[str] = Graph(self.vertexes)
+
+    def test_vertex_filter(self) -> None:
+        self.assertEqual(self._get_names(self.graph.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "5", "4"])
+        view: GraphView[str] = GraphView(self.graph, vertex_filter=self._is_listed)
+        self.assertEqual(self._get_names(view.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "1", "2", "3", "4"])
+        self.assertEqual(self._get_names(view.breadth_first_search(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "4"])
+        self.assertIsNone(view.dijkstra(self.vertexes[0], self.vertexes[5]))
+        self.assertIsNone(view.breadth_first_search(self.vertexes[5], self.vertexes[4]))
+        self.assertFalse(view.are_connected(self.vertexes[0], self.vertexes[5]))
+        self.assertEqual([vertex.name for vertex in view.vertexes], ["0", "1", "2", "3", "4"])
+        self.assertFalse(view.has_vertex(self.vertexes[5]))
+        self.assertFalse(view.has_edge(self.vertexes[0], self.vertexes[5]))
+        self.assertTrue(view.has_edge(self.vertexes[0], self.vertexes[1]))
+
+        # Views are not copies: they reflect changes to the graph
+        self.vertexes[1].add_neighbor(self.vertexes[4], 1.0)
+        self.assertEqual(self._get_names(view.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "1", "4"])
+
+    def test_edge_filter_and_narrowing(self) -> None:
+        view: GraphView[str] = GraphView(self.graph, edge_filter=self._is_cheap)
+        self.assertEqual(self._get_names(view.breadth_first_search(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "5", "4"])
+        narrower_view: GraphView[str] = view.view(vertex_filter=self._is_listed)
+        self.assertEqual(self._get_names(narrower_view.breadth_first_search(self.vertexes[0], self.vertexes[4], reverse=False)), ["0", "1", "2", "3", "4"])
+        self.assertFalse(narrower_view.has_edge(self.vertexes[0], self.vertexes[4]))
+        self.assertIsNone(narrower_view.view(vertex_filter=self._is_not_two).dijkstra(self.vertexes[0], self.vertexes[4]))
+
+    def test_max_hops(self) -> None:
+        self.assertEqual(self._get_names(self.graph.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False, max_hops=2)), ["0", "5", "4"])
+        self.assertEqual(self._get_names(self.graph.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False, max_hops=1)), ["0", "4"])
+        self.assertIsNone(self.graph.dijkstra(self.vertexes[0], self.vertexes[3], max_hops=2))
+        self.assertEqual(self._get_names(self.graph.dijkstra(self.vertexes[0], self.vertexes[0], max_hops=0)), ["0"])
+        self.assertIsNone(self.graph.breadth_first_search(self.vertexes[0], self.vertexes[3], max_hops=2))
+        self.assertEqual(self._get_names(self.graph.breadth_first_search(self.vertexes[0], self.vertexes[3], reverse=False, max_hops=3)), ["0", "1", "2", "3"])
+
+        view: GraphView[str] = GraphView(self.graph, vertex_filter=self._is_listed)
+        self.assertEqual(self._get_names(view.dijkstra(self.vertexes[0], self.vertexes[4], reverse=False, max_hops=3)), ["0", "4"])
+        self.assertFalse(view.are_connected(self.vertexes[0], self.vertexes[3], max_hops=2))
+
+        with self.assertRaisesRegex(ValueError, "max_hops must be a non-negative integer"):
+            self.graph.dijkstra(self.vertexes[0], self.vertexes[4], max_hops=-1)
+
+    def test_hop_limited_dijkstra_against_dynamic_programming(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for _ in range(5):
+            vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(25)]
+            for _ in range(80):
+                source: Vertex[int] = randomizer.choice(vertexes)
+                target: Vertex[int] = randomizer.choice(vertexes)
+                if source is not target and not source.has_neighbor(target):
+                    source.add_neighbor(target, float(randomizer.randrange(1, 20)))
+            graph: Graph[int] = Graph(vertexes)
+            for max_hops in range(6):
+                # distance[v] = shortest distance from vertexes[0] with at most hops edges
+                distance: Dict[Vertex[int], float] = {vertexes[0]: 0.0}
+                for _ in range(max_hops):
+                    next_distance: Dict[Vertex[int], float] = dict(distance)
+                    for vertex, vertex_distance in distance.items():
+                        for neighbor in vertex.neighbors:
+                            next_distance[neighbor] = min(next_distance.get(neighbor, float("inf")), vertex_distance + vertex.get_weight(neighbor))
+                    distance = next_distance
+                for end in vertexes:
+                    path: Optional[Iterator[Vertex[int]]] = graph.dijkstra(vertexes[0], end, reverse=False, max_hops=max_hops)
+                    if end not in distance:
+                        self.assertIsNone(path)
+                        continue
+                    assert path is not None
+                    path_vertexes: List[Vertex[int]] = list(path)
+                    self.assertLessEqual(len(path_vertexes), max_hops + 1)
+                    self.assertEqual(path_vertexes[0], vertexes[0])
+                    self.assertEqual(path_vertexes[-1], end)
+                    self.assertEqual(sum(path_vertexes[i].get_weight(path_vertexes[i + 1]) for i in range(len(path_vertexes) - 1)), distance[end])
+
+    @staticmethod
+    def _get_names(path: Optional[Iterator[Vertex[str]]]) -> Optional[List[str]]:
+        return [vertex.name for vertex in path] if path is not None else None
+
+    @staticmethod
+    def _is_listed(vertex: Vertex[str]) -> bool:
+        return vertex.name != "5"
+
+    @staticmethod
+    def _is_not_two(vertex: Vertex[str]) -> bool:
+        return vertex.name != "2"
+
+    @staticmethod
+    def _is_cheap(source: Vertex[str], target: Vertex[str]) -> bool:
+        return source.get_weight(target) < 5.0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()
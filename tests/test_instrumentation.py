@@ -0,0 +1,90 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import sys
+import unittest
+from typing import List
+
+from prezzemolo.avl_tree import AVLTree
+from prezzemolo.graph import Graph
+from prezzemolo.instrumentation import Instrumentation, InstrumentationSample
+from prezzemolo.vertex import Vertex
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None  # pylint: disable=invalid-name
+
+    def test_avl_tree(self) -> None:
+        samples: List[InstrumentationSample] = []
+        instrumentation: Instrumentation = Instrumentation(callback=samples.append)
+        tree: AVLTree[int, int] = AVLTree(instrumentation=instrumentation)
+        for value in [10, 20, 30, 40, 50, 60, 70]:
+            tree.insert_node(value, value)
+
+        self.assertEqual(instrumentation.call_counts, {"insert_node": 7})
+        # Sorted insertion of 7 keys: one rotation at 30, 50, 60 and 70
+        self.assertEqual(instrumentation.counters, {"insert_node.rotations": 4})
+        self.assertEqual(instrumentation.high_water_marks, {"insert_node.height": 3})
+        self.assertEqual(len(samples), 7)
+        self.assertEqual([sample.counters["rotations"] for sample in samples], [0, 0, 1, 0, 1, 1, 1])
+
+        instrumentation.reset()
+        self.assertEqual(tree.find_max_value_less_than(45), 40)
+        self.assertEqual(tree.find_max_value_less_than(5), None)
+        self.assertEqual(instrumentation.call_counts, {"find_max_value_less_than": 2})
+        # One comparison per level: 45 visits 40, 60, 50 and 5 visits 40, 20, 10
+        self.assertEqual(instrumentation.counters, {"find_max_value_less_than.comparisons": 6})
+        self.assertEqual(instrumentation.high_water_marks, {"find_max_value_less_than.depth": 3})
+        self.assertGreaterEqual(instrumentation.durations["find_max_value_less_than"], 0.0)
+
+    def test_graph(self) -> None:
+        instrumentation: Instrumentation = Instrumentation()
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(4)]
+        vertexes[0].add_neighbor(vertexes[1], 1)
+        vertexes[0].add_neighbor(vertexes[2], 4)
+        vertexes[1].add_neighbor(vertexes[2], 1)
+        vertexes[2].add_neighbor(vertexes[3], 1)
+        graph: Graph[int] = Graph(vertexes, instrumentation=instrumentation)
+
+        path = graph.dijkstra(vertexes[0], vertexes[3])
+        assert path
+        self.assertEqual(instrumentation.call_counts, {"dijkstra": 1})
+        self.assertEqual(instrumentation.counters, {"dijkstra.vertexes_settled": 3, "dijkstra.edges_relaxed": 4})
+        self.assertEqual(instrumentation.high_water_marks, {"dijkstra.heap_size": 2})
+
+        instrumentation.reset()
+        path = graph.breadth_first_search(vertexes[0], vertexes[3])
+        assert path
+        path = graph.bellman_ford(vertexes[0], vertexes[3])
+        assert path
+        self.assertEqual(instrumentation.call_counts, {"breadth_first_search": 1, "shortest_path_faster": 1})
+        self.assertEqual(
+            instrumentation.counters,
+            {"breadth_first_search.vertexes_discovered": 4, "shortest_path_faster.vertexes_reached": 4, "shortest_path_faster.edges_relaxed": 4},
+        )
+
+    def test_disabled(self) -> None:
+        tree: AVLTree[int, int] = AVLTree()
+        tree.insert_node(1, 1)
+        self.assertIsNone(tree.instrumentation)
+        graph: Graph[int] = Graph([Vertex[int](name="1")])
+        self.assertIsNone(graph.instrumentation)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()
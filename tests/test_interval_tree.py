@@ -0,0 +1,99 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import sys
+import unittest
+from datetime import datetime
+from typing import List, Optional
+
+from prezzemolo.avl_tree import AVLNode
+from prezzemolo.interval_tree import Interval, IntervalNode, IntervalTree
+
+
+class TestIntervalTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None  # pylint: disable=invalid-name
+
+    def test_rate_validity(self) -> None:
+        tree: IntervalTree[datetime, str] = IntervalTree()
+        tree.insert_interval(datetime(2021, 1, 1), datetime(2021, 2, 1), "january")
+        tree.insert_interval(datetime(2021, 2, 1), datetime(2021, 3, 1), "february")
+        tree.insert_interval(datetime(2021, 1, 15), datetime(2021, 2, 15), "promotion")
+        tree.insert_interval(datetime(2020, 1, 1), datetime(2022, 1, 1), "base")
+
+        self.assertEqual([interval.value for interval in tree.find_intervals_containing(datetime(2021, 1, 20))], ["base", "january", "promotion"])
+        self.assertEqual([interval.value for interval in tree.find_intervals_containing(datetime(2021, 2, 1))], ["base", "promotion", "february"])
+        self.assertEqual([interval.value for interval in tree.find_intervals_containing(datetime(2021, 6, 1))], ["base"])
+        self.assertEqual(tree.find_intervals_containing(datetime(2022, 1, 1)), [])
+        self.assertEqual(
+            [interval.value for interval in tree.find_intervals_overlapping(datetime(2021, 2, 15), datetime(2021, 2, 16))],
+            ["base", "february"],
+        )
+        self.assertEqual(
+            tree.find_intervals_overlapping(datetime(2021, 2, 14), datetime(2021, 2, 15))[1],
+            Interval(datetime(2021, 1, 15), datetime(2021, 2, 15), "promotion"),
+        )
+        # Floor lookup by start still works
+        self.assertEqual(tree.find_max_value_less_than(datetime(2021, 1, 20)), Interval(datetime(2021, 1, 15), datetime(2021, 2, 15), "promotion"))
+
+        with self.assertRaisesRegex(ValueError, "interval start must be less than end"):
+            tree.insert_interval(datetime(2021, 1, 1), datetime(2021, 1, 1), "empty")
+        with self.assertRaisesRegex(ValueError, "query start must be less than end"):
+            tree.find_intervals_overlapping(datetime(2021, 1, 2), datetime(2021, 1, 1))
+
+    def test_random_intervals_against_scan(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        tree: IntervalTree[int, int] = IntervalTree()
+        intervals: List[Interval[int, int]] = []
+        self.assertEqual(tree.find_intervals_containing(0), [])
+        for index in range(500):
+            start: int = randomizer.randrange(1000)
+            end: int = start + randomizer.choice([1, 2, 10, 50, 300])
+            tree.insert_interval(start, end, index)
+            intervals.append(Interval(start, end, index))
+            if index % 100 == 99:
+                self._check_max_end(tree.root)
+                # Intervals with equal start are returned in insertion order
+                sorted_intervals: List[Interval[int, int]] = sorted(intervals, key=self._get_start)
+                for point in range(-1, 1400, 7):
+                    self.assertEqual(
+                        tree.find_intervals_containing(point), [interval for interval in sorted_intervals if interval.start <= point < interval.end]
+                    )
+                for query_start in range(-10, 1400, 37):
+                    query_end: int = query_start + randomizer.choice([1, 5, 100])
+                    self.assertEqual(
+                        tree.find_intervals_overlapping(query_start, query_end),
+                        [interval for interval in sorted_intervals if interval.start < query_end and query_start < interval.end],
+                    )
+
+    @staticmethod
+    def _get_start(interval: Interval[int, int]) -> int:
+        return interval.start
+
+    # Checks that max_end is the maximum end of each subtree and returns it
+    def _check_max_end(self, root: Optional[AVLNode[int, Interval[int, int]]]) -> int:
+        if root is None:
+            return -sys.maxsize
+        assert isinstance(root, IntervalNode)
+        max_end: int = max(root.end, self._check_max_end(root.left), self._check_max_end(root.right))
+        self.assertEqual(root.max_end, max_end)
+        return max_end
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()
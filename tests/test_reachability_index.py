@@ -0,0 +1,139 @@
+# Copyright 2022 eprbell
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import random
+import sys
+import unittest
+from typing import Dict, List
+
+from prezzemolo.graph import Graph
+from prezzemolo.reachability_index import ReachabilityIndex
+from prezzemolo.vertex import Vertex
+
+
+# pylint: disable=invalid-name
+class TestReachabilityIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.maxDiff = None
+
+    def test_directed_graph(self) -> None:
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(7)]
+        # Two cycles (0, 1, 2) and (3, 4) linked by 2->3, plus a tail 4->5 and an isolated vertex 6
+        for source, target in [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (4, 3), (4, 5)]:
+            vertexes[source].add_neighbor(vertexes[target])
+        index: ReachabilityIndex[int] = ReachabilityIndex(vertexes)
+
+        self.assertTrue(index.are_connected(vertexes[1], vertexes[0]))
+        self.assertTrue(index.are_connected(vertexes[0], vertexes[5]))
+        self.assertTrue(index.are_connected(vertexes[6], vertexes[6]))
+        self.assertFalse(index.are_connected(vertexes[3], vertexes[2]))
+        self.assertFalse(index.are_connected(vertexes[5], vertexes[4]))
+        self.assertFalse(index.are_connected(vertexes[0], vertexes[6]))
+
+        # Closing a cycle merges components
+        vertexes[5].add_neighbor(vertexes[1])
+        self.assertTrue(index.add_edge(vertexes[5], vertexes[1]))
+        self.assertTrue(index.are_connected(vertexes[3], vertexes[2]))
+        self.assertTrue(index.are_connected(vertexes[5], vertexes[4]))
+        self.assertFalse(index.are_connected(vertexes[6], vertexes[0]))
+
+        vertexes[6].add_neighbor(vertexes[0])
+        self.assertTrue(index.add_edge(vertexes[6], vertexes[0]))
+        self.assertTrue(index.are_connected(vertexes[6], vertexes[5]))
+        self.assertFalse(index.are_connected(vertexes[5], vertexes[6]))
+
+        # Vertexes and edges that are unknown to the index can't be added incrementally
+        unknown_vertex: Vertex[int] = Vertex[int](name="unknown")
+        self.assertFalse(index.add_edge(vertexes[0], unknown_vertex))
+        self.assertFalse(index.are_connected(vertexes[0], unknown_vertex))
+
+    def test_bidirectional_graph(self) -> None:
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(6)]
+        graph: Graph[int] = Graph(vertexes)
+        vertexes[0].add_neighbor_bidirectional(vertexes[1])
+        vertexes[2].add_neighbor_bidirectional(vertexes[3])
+        self.assertTrue(graph.are_connected(vertexes[1], vertexes[0]))
+        self.assertFalse(graph.are_connected(vertexes[0], vertexes[2]))
+
+        # The index was built by the first call to are_connected() and is now updated incrementally
+        vertexes[1].add_neighbor_bidirectional(vertexes[2])
+        self.assertTrue(graph.are_connected(vertexes[3], vertexes[0]))
+        self.assertFalse(graph.are_connected(vertexes[3], vertexes[4]))
+
+        new_vertex: Vertex[int] = Vertex[int](name="6", data=6)
+        new_vertex.add_neighbor(vertexes[4])
+        graph.add_vertex(new_vertex)
+        self.assertTrue(graph.are_connected(new_vertex, vertexes[4]))
+        self.assertFalse(graph.are_connected(vertexes[4], new_vertex))
+        vertexes[4].add_neighbor(new_vertex)
+        self.assertTrue(graph.are_connected(vertexes[4], new_vertex))
+        self.assertFalse(graph.are_connected(new_vertex, vertexes[0]))
+
+    def test_bounded_cache(self) -> None:
+        # Chain 0 -> 1 -> ... -> 49
+        vertexes: List[Vertex[int]] = [Vertex[int](name=str(i), data=i) for i in range(50)]
+        for source, target in zip(vertexes, vertexes[1:]):
+            source.add_neighbor(target)
+        index: ReachabilityIndex[int] = ReachabilityIndex(vertexes, cache_size=8)
+        self.assertEqual(index.cache_size, 8)
+
+        # Edges that don't close a cycle are checked with the topological order and don't fill the cache
+        for source, target in zip(vertexes, vertexes[2:]):
+            source.add_neighbor(target)
+            self.assertTrue(index.add_edge(source, target))
+        self.assertEqual(index.cached_component_count, 0)
+        # Same for queries going backwards in the topological order
+        self.assertFalse(index.are_connected(vertexes[49], vertexes[0]))
+        self.assertEqual(index.cached_component_count, 0)
+
+        for start in vertexes:
+            self.assertTrue(index.are_connected(start, vertexes[-1]))
+            self.assertLessEqual(index.cached_component_count, 8)
+        self.assertEqual(index.cached_component_count, 8)
+
+        # Closing a cycle clears the cache
+        vertexes[49].add_neighbor(vertexes[0])
+        self.assertTrue(index.add_edge(vertexes[49], vertexes[0]))
+        self.assertEqual(index.cached_component_count, 0)
+        self.assertTrue(index.are_connected(vertexes[49], vertexes[1]))
+
+        with self.assertRaisesRegex(ValueError, "cache_size must be a positive integer"):
+            ReachabilityIndex(vertexes, cache_size=0)
+
+    def test_random_graphs_against_breadth_first_search(self) -> None:
+        randomizer: random.Random = random.Random(42)
+        for _ in range(10):
+            vertexes: Dict[int, Vertex[int]] = {i: Vertex[int](name=str(i), data=i) for i in range(20)}
+            graph: Graph[int] = Graph(list(vertexes.values()))
+            self.assertFalse(graph.are_connected(vertexes[0], vertexes[1]))
+            for _ in range(30):
+                source: Vertex[int] = vertexes[randomizer.randrange(20)]
+                target: Vertex[int] = vertexes[randomizer.randrange(20)]
+                if source.has_neighbor(target):
+                    continue
+                source.add_neighbor(target)
+                for start in vertexes.values():
+                    for end in vertexes.values():
+                        self.assertEqual(
+                            graph.are_connected(start, end),
+                            graph.breadth_first_search(start, end) is not None,
+                            f"{start.name} -> {end.name}",
+                        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr)
+    logging.getLogger("abc").setLevel(logging.DEBUG)
+    unittest.main()